@@ -0,0 +1,64 @@
+# Compare the speed, memory and accuracy of single and double precision simulations
+import os
+import time
+
+import numpy as np
+from verfishd import StimuliProfile, VerFishDModel, MultiPopulationModel
+from Examples.real_example.example_factors import Oxygen, Temperature
+
+
+def migration_speed(E: float) -> float:
+    return E * abs(E) / (0.1 + E ** 2)
+
+
+def run(create, number_of_steps):
+    model = create()
+    start = time.perf_counter()
+    model.simulate(number_of_steps)
+    return model, time.perf_counter() - start
+
+
+def report(title, reference, candidate, reference_time, candidate_time, history_bytes):
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    print(f"{title}")
+    print(f"  float64: {reference_time:7.3f} s")
+    print(f"  float32: {candidate_time:7.3f} s (x{reference_time / candidate_time:.2f})")
+    print(f"  history: {history_bytes[0] / 2 ** 20:7.1f} MiB -> {history_bytes[1] / 2 ** 20:.1f} MiB")
+    print(f"  max. abs. deviation of the result: {np.max(np.abs(candidate - reference)):.2e}")
+    print(f"  relative mass drift: {abs(candidate.sum() / reference.sum() - 1):.2e}")
+
+
+data_file = f"{os.path.dirname(__file__)}/../real_example/cnv/example.cnv"
+profile = StimuliProfile.read_from_cnv(data_file, columns=['tv290C', 'oxygen_ml_L'])
+number_of_steps = 2000
+
+
+def single(dtype):
+    return lambda: VerFishDModel('Example', profile, migration_speed, [Temperature('tv290C', 0.48), Oxygen('oxygen_ml_L', 0.52)], dtype=dtype)
+
+
+(model64, time64), (model32, time32) = run(single(np.float64), number_of_steps), run(single(np.float32), number_of_steps)
+report(
+    f"Single population, {profile.depth.size} depths, {number_of_steps} steps",
+    model64.result, model32.result, time64, time32,
+    (model64.steps.memory_usage().sum(), model32.steps.memory_usage().sum())
+)
+
+temperature_weights = np.linspace(0.0, 1.0, 64)
+populations = {
+    f"population {index}": [Temperature('tv290C', weight), Oxygen('oxygen_ml_L', 1.0 - weight)]
+    for index, weight in enumerate(temperature_weights)
+}
+
+
+def ensemble(dtype):
+    return lambda: MultiPopulationModel('Ensemble', profile, migration_speed, populations, dtype=dtype)
+
+
+(ensemble64, time64), (ensemble32, time32) = run(ensemble(np.float64), 500), run(ensemble(np.float32), 500)
+report(
+    f"{len(populations)} populations, {profile.depth.size} depths, 500 steps",
+    ensemble64.result, ensemble32.result, time64, time32,
+    (ensemble64._history.nbytes, ensemble32._history.nbytes)
+)
@@ -0,0 +1,11 @@
+import os
+from verfishd import VerFishDModel
+from matplotlib import pyplot as plt
+
+spec_file = f"{os.path.dirname(__file__)}/model_spec.toml"
+
+model = VerFishDModel.from_spec(spec_file, simulate=True)
+
+model.plot()
+
+plt.show()
@@ -1,3 +1,4 @@
 from fixtures.physical_factor_fixtures import temperature_factor_fixture, pressure_factor_fixture
-from fixtures.physical_stimuli_fixtures import temperature_stimuli_fixture
+from fixtures.physical_stimuli_fixtures import temperature_stimuli_fixture, profile_files_fixture
 from fixtures.migration_speed_fixtures import migration_speed_fixture
+from fixtures.model_fixtures import model_factory_fixture, build_model_fixture
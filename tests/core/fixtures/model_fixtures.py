@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+from verfishd import VerFishDModel, linear_migration_speed
+
+
+@pytest.fixture
+def model_factory_fixture(temperature_stimuli_fixture, temperature_factor_fixture, pressure_factor_fixture):
+    # The default migration speed is a module-level function, so models can be sent to worker processes
+    def create(temperature_weight=1.0, migration_speed=linear_migration_speed, profile=temperature_stimuli_fixture, dtype=np.float64):
+        factors = [temperature_factor_fixture(temperature_weight), pressure_factor_fixture(1.0 - temperature_weight)]
+        return VerFishDModel('test', profile, migration_speed, factors, dtype=dtype)
+
+    return create
+
+
+@pytest.fixture
+def build_model_fixture(temperature_factor_fixture, migration_speed_fixture):
+    return lambda profile: VerFishDModel('test', profile, migration_speed_fixture, [temperature_factor_fixture(1.0)])
@@ -2,6 +2,18 @@ import pytest
 from verfishd import PhysicalFactor
 
 
+class Temperature(PhysicalFactor):
+    """
+    A temperature factor defined at module level, so model specifications can import it.
+    """
+
+    def __init__(self, name: str, weight: float):
+        super().__init__(name, weight)
+
+    def _calculate(self, value: float) -> float:
+        return 0.0 if value > 5 else -1.0
+
+
 @pytest.fixture
 def temperature_factor_fixture():
     # Define a custom PhysicalFactor
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+import pandas as pd
 import pytest
 from verfishd import StimuliProfile
 
@@ -10,3 +11,18 @@ def temperature_stimuli_fixture() -> StimuliProfile:
     stimuli_profile = StimuliProfile.read_from_tabular_file(csv_file)
 
     return stimuli_profile
+
+
+@pytest.fixture
+def profile_files_fixture(tmp_path) -> list[str]:
+    files = []
+    for index in range(6):
+        file_path = tmp_path / "profiles" / f"profile_{index}.csv"
+        file_path.parent.mkdir(exist_ok=True)
+        pd.DataFrame({
+            'depth': [0.0, 1.0, 2.0, 3.0],
+            'temperature': [7.0, 6.0 - index, 4.0, 3.0]
+        }).to_csv(file_path, index=False)
+        files.append(str(file_path))
+
+    return files
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from verfishd import VerFishDModel, migration_speed_with_demographic_noise
+from verfishd.core.calibration import _adjoint, _forward, mse_loss, kl_loss
+
+
+def smooth_migration_speed(E: float) -> float:
+    return E * abs(E) / (0.1 + E ** 2)
+
+
+@pytest.mark.parametrize("loss", [mse_loss, kl_loss])
+def test_adjoint_gradient_matches_finite_differences(loss):
+    rng = np.random.default_rng(0)
+    migration_speeds = rng.uniform(-0.5, 0.5, 8)
+    initial = np.ones(8)
+    observed = rng.uniform(0.1, 1.0, 8)
+
+    def loss_for(speeds):
+        return loss(_forward(initial, speeds, 20)[-1], observed)[0]
+
+    states = _forward(initial, migration_speeds, 20)
+    gradient = _adjoint(states, migration_speeds, loss(states[-1], observed)[1])
+
+    step = 1e-7
+    expected = [(loss_for(migration_speeds + step * e) - loss_for(migration_speeds - step * e)) / (2 * step) for e in np.eye(8)]
+
+    assert np.allclose(gradient, expected, atol=1e-6), "The adjoint gradient should match finite differences"
+
+
+def test_recover_the_weights_of_a_simulated_observation(temperature_stimuli_fixture, temperature_factor_fixture, pressure_factor_fixture):
+    reference = VerFishDModel('reference', temperature_stimuli_fixture, smooth_migration_speed, [temperature_factor_fixture(0.7), pressure_factor_fixture(0.3)])
+    reference.simulate(20)
+
+    model = VerFishDModel('test', temperature_stimuli_fixture, smooth_migration_speed, [temperature_factor_fixture(0.6), pressure_factor_fixture(0.4)])
+    calibration = model.calibrate(reference.result, number_of_steps=20)
+
+    assert np.allclose(calibration.weights, [0.7, 0.3], atol=1e-2), "The calibration should recover the weights"
+    assert np.isclose(sum(factor.weight for factor in model.factors), 1.0), "The fitted weights should sum to 1"
+    assert [factor.weight for factor in model.factors] == list(calibration.weights), "The fitted weights should be assigned"
+
+    model.simulate(20)
+    assert np.allclose(model.result, calibration.prediction), "The prediction should match a simulation with the fitted weights"
+
+
+def test_interpolate_an_observation_indexed_by_depth(temperature_stimuli_fixture, temperature_factor_fixture, pressure_factor_fixture):
+    model = VerFishDModel('test', temperature_stimuli_fixture, smooth_migration_speed, [temperature_factor_fixture(0.5), pressure_factor_fixture(0.5)])
+    observed = pd.Series([0.0, 1.0], index=[0.0, 10.0])
+
+    calibration = model.calibrate(observed, loss="kl", number_of_steps=50, max_iterations=5)
+
+    assert calibration.prediction.index.equals(model.steps.index)
+
+
+def test_throw_for_a_stochastic_migration_speed_without_seed(temperature_stimuli_fixture, temperature_factor_fixture):
+    model = VerFishDModel('test', temperature_stimuli_fixture, migration_speed_with_demographic_noise, [temperature_factor_fixture(1.0)])
+
+    with pytest.raises(ValueError):
+        model.calibrate(np.ones(11))
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from verfishd import CNVTail, StimuliProfile, follow_cnv
+
+HEADER = """* Sea-Bird SBE 19plus V2 Data File:
+* FileName = cast.hex
+* NMEA Latitude = 55 14.905500 N
+* NMEA Longitude = 016 14.931100 E
+# nquan = 3
+# nvalues = 6
+# units = specified
+# name 0 = prDM: Pressure, Digiquartz [db]
+# name 1 = t068C: Temperature [IPTS-68, deg C]
+# name 2 = sal00: Salinity, Practical [PSU]
+# interval = seconds: 0.25
+# start_time = Jun 17 2024 09:35:49 [NMEA time, header]
+# bad_flag = -9.990e-29
+# file_type = ascii
+*END*
+"""
+
+SCANS = np.array([
+    [1.0, 7.0, 7.1],
+    [2.0, 4.5, 7.2],
+    [3.0, 3.0, -9.990e-29],
+    [4.0, 6.0, 7.4],
+    [5.0, 4.2, 7.5],
+    [6.0, 3.0, 7.6]
+])
+
+
+def scan_lines(scans: np.ndarray) -> str:
+    return "".join("".join(f"{value:11.4f}" if abs(value) > 1e-20 else f"{value:11.3e}" for value in scan) + "\n" for scan in scans)
+
+
+def test_parse_only_appended_scans(tmp_path):
+    file_path = tmp_path / "cast.cnv"
+    tail = CNVTail(file_path, columns=['temperature', 'PSAL'])
+    assert tail.poll() == 0, "A missing file should not be an error"
+
+    text = HEADER + scan_lines(SCANS)
+    file_path.write_text(HEADER[:40])
+    assert tail.poll() == 0 and not tail.header_complete, "The header is not complete yet"
+
+    # The last write ends in the middle of a scan line
+    cut = len(HEADER) + 2 * 34 + 20
+    file_path.write_text(text[:cut])
+    assert tail.poll() == 2, "Only complete scan lines should be parsed"
+
+    file_path.write_text(text)
+    assert tail.poll() == 4, "The partial scan line should be completed by the next poll"
+    assert tail.poll() == 0, "Nothing new was appended"
+
+    expected = StimuliProfile.read_from_cnv(file_path, columns=['temperature', 'PSAL'])
+    assert tail.profile is not None
+    assert tail.profile.stimuli == ['temperature', 'PSAL']
+    assert np.array_equal(tail.profile.depth, expected.depth)
+    assert np.allclose(tail.profile.values, expected.values, equal_nan=True), "The profile should match reading the finished file"
+    assert tail.profile.source == expected.source
+
+
+def test_throw_when_a_column_is_missing(tmp_path):
+    file_path = tmp_path / "cast.cnv"
+    file_path.write_text(HEADER + scan_lines(SCANS))
+
+    with pytest.raises(ValueError):
+        CNVTail(file_path, columns=['oxygen_ml_L']).poll()
+
+
+def test_update_the_model_for_new_depths(tmp_path, build_model_fixture):
+    file_path = tmp_path / "cast.cnv"
+    file_path.write_text(HEADER + scan_lines(SCANS[:3]))
+    tail = CNVTail(file_path, columns=['temperature'])
+    tail.poll()
+    model = build_model_fixture(tail.profile)
+    model.simulate_adaptive()
+
+    file_path.write_text(HEADER + scan_lines(SCANS))
+    tail.poll()
+
+    assert model.update_profile() == 3
+    assert model.steps.iloc[3:, -1].eq(1.0).all(), "New depths should start with the initial density"
+    assert model.steps.iloc[3:, 0].isna().all(), "Earlier steps have no values for new depths"
+
+    expected = build_model_fixture(StimuliProfile.read_from_cnv(file_path, columns=['temperature']))
+    assert np.allclose(model.factor_responses, expected.factor_responses, equal_nan=True)
+
+    model.simulate_adaptive()
+    expected.simulate_adaptive()
+    assert np.allclose(model.result, expected.result, atol=1e-6), "The warm start should reach the same equilibrium"
+
+
+def test_follow_a_growing_file(tmp_path, build_model_fixture):
+    file_path = tmp_path / "cast.cnv"
+    file_path.write_text(HEADER + scan_lines(SCANS[:3]))
+    updates = follow_cnv(file_path, build_model_fixture, columns=['temperature'], poll_interval=0.01, idle_timeout=0.05)
+
+    model = next(updates)
+    assert len(model.result) == 3
+
+    with open(file_path, 'a') as file:
+        file.write(scan_lines(SCANS[3:]))
+
+    assert next(updates) is model, "The model should be updated in place"
+    assert len(model.result) == 6
+    assert model.steps.shape == (6, 1), "Only the last state should be kept between updates"
+    assert model.steps.iloc[:, -1].equals(model.result)
+    assert list(updates) == [], "Following should stop once the file is idle"
@@ -0,0 +1,44 @@
+import numpy as np
+from verfishd.core.migration_kernel import run_migration_steps, migration_operator, apply_operator, implicit_step, integrate_adaptive
+
+
+MIGRATION_SPEEDS = np.array([0.0, 0.3, -0.5, 0.2, 0.4, -0.1, -0.8])
+
+
+def test_migration_operator_reproduces_a_single_step():
+    initial = np.linspace(1.0, 2.0, MIGRATION_SPEEDS.size)
+    operator = migration_operator(MIGRATION_SPEEDS)
+
+    expected = run_migration_steps(initial, MIGRATION_SPEEDS, 1)[0]
+
+    assert np.allclose(initial + apply_operator(operator, initial), expected), "x + A x should equal one step"
+
+
+def test_run_several_populations_at_once():
+    initial = np.ones((2, MIGRATION_SPEEDS.size))
+    speeds = np.vstack([MIGRATION_SPEEDS, -MIGRATION_SPEEDS])
+
+    steps = run_migration_steps(initial, speeds, 5)
+
+    assert steps.shape == (5, 2, MIGRATION_SPEEDS.size)
+    assert np.allclose(steps[-1, 1], run_migration_steps(initial[1], -MIGRATION_SPEEDS, 5)[-1])
+
+
+def test_implicit_step_conserves_the_population_for_large_steps():
+    initial = np.ones(MIGRATION_SPEEDS.size)
+    state = implicit_step(migration_operator(MIGRATION_SPEEDS), initial, dt=1e6)
+
+    assert np.isclose(state.sum(), initial.sum()), "Backward Euler should conserve the population"
+    assert (state >= 0).all(), "Backward Euler should keep the distribution non-negative"
+
+
+def test_adaptive_integration_reaches_the_equilibrium_of_the_step_loop():
+    initial = np.ones(MIGRATION_SPEEDS.size)
+
+    integration = integrate_adaptive(initial, MIGRATION_SPEEDS, equilibrium_tolerance=1e-10)
+    expected = run_migration_steps(initial, MIGRATION_SPEEDS, 5000)[-1]
+
+    assert integration.converged, "The integration should reach equilibrium"
+    assert integration.number_of_steps < 500, "The step size should grow toward equilibrium"
+    assert np.allclose(integration.states.sum(axis=1), initial.sum()), "Every step should conserve the population"
+    assert np.allclose(integration.states[-1], expected, atol=1e-6)
@@ -111,3 +111,44 @@ def test_convert_to_reasonable_result_for_a_several_step(temperature_stimuli_fix
 
     assert model.steps.index.name == expected_result.index.name, "Index name should be the same"
     assert np.allclose(model.steps[f"t={nr_of_steps}"], expected_result, atol=1e-8), "Simulation should be correct for a single step"
+
+def test_simulate_adaptive_reaches_the_equilibrium_of_the_fixed_step_simulation(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture):
+    model = VerFishDModel('test', temperature_stimuli_fixture, migration_speed_fixture, [temperature_factor_fixture(1.0)])
+
+    integration = model.simulate_adaptive()
+
+    expected_result = pd.Series(data=[1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 4.0], index=model.steps.index)
+
+    assert integration.converged, "The adaptive simulation should reach equilibrium"
+    assert model.steps.columns[-1] == f"t={integration.time:.10g}", "Steps should be labelled with the simulated time"
+    assert np.allclose(model.result, expected_result, atol=1e-6), "The adaptive simulation should converge to the same distribution"
+
+def test_continue_the_simulated_time_when_mixing_simulation_methods(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture):
+    model = VerFishDModel('test', temperature_stimuli_fixture, migration_speed_fixture, [temperature_factor_fixture(1.0)])
+
+    model.simulate(number_of_steps=2)
+    integration = model.simulate_adaptive(max_time=3.5)
+    model.simulate(number_of_steps=2)
+
+    times = [float(column.removeprefix("t=")) for column in model.steps.columns]
+
+    assert integration.time == 3.5, "The adaptive simulation should stop at the maximum time"
+    assert model.steps.columns.is_unique, "Step labels should not repeat"
+    assert np.all(np.diff(times) > 0), "Step labels should increase with the simulated time"
+    assert list(model.steps.columns[-2:]) == ["t=6.5", "t=7.5"], "Fixed steps should continue from the adaptive time"
+
+def test_simulate_in_single_precision(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture):
+    model = VerFishDModel('test', temperature_stimuli_fixture, migration_speed_fixture, [temperature_factor_fixture(1.0)], dtype=np.float32)
+    reference = VerFishDModel('test', temperature_stimuli_fixture, migration_speed_fixture, [temperature_factor_fixture(1.0)])
+
+    model.simulate(number_of_steps=30)
+    reference.simulate(number_of_steps=30)
+
+    assert model.factor_responses.dtype == np.float32, "Factor responses should use the requested dtype"
+    assert (model.steps.dtypes == np.float32).all(), "Steps should use the requested dtype"
+    assert np.isclose(model.result.to_numpy().sum(dtype=np.float64), model.steps['t=0'].to_numpy().sum(dtype=np.float64), rtol=1e-6), "The population should be conserved"
+    assert np.allclose(model.result, reference.result, atol=1e-5), "Single precision should match double precision closely"
+
+def test_throw_on_non_floating_dtype(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture):
+    with pytest.raises(TypeError):
+        VerFishDModel('test', temperature_stimuli_fixture, migration_speed_fixture, [temperature_factor_fixture(1.0)], dtype=np.int32)
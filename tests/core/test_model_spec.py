@@ -0,0 +1,89 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fixtures.physical_factor_fixtures import Temperature
+from verfishd import ModelSpec, StimuliProfile, VerFishDModel, linear_migration_speed, migration_speed_with_demographic_noise
+from functools import partial
+
+
+@pytest.fixture
+def profile_fixture() -> StimuliProfile:
+    return StimuliProfile.read_from_tabular_file(Path(__file__).parent / "fixtures" / "temperature_stimuli.csv")
+
+
+@pytest.fixture
+def model_fixture(profile_fixture) -> VerFishDModel:
+    migration_speed = partial(migration_speed_with_demographic_noise, half_saturation_parameter=0.2)
+    return VerFishDModel('test', profile_fixture, migration_speed, [Temperature('temperature', 1.0)])
+
+
+@pytest.mark.parametrize("extension", ["json", "toml"])
+def test_round_trip_a_model_through_a_spec_file(model_fixture, tmp_path, extension):
+    file_path = tmp_path / f"model.{extension}"
+    model_fixture.to_spec(number_of_steps=20, seed=3).save(file_path)
+
+    model = VerFishDModel.from_spec(file_path, simulate=True)
+    model_fixture.simulate(20, seed=3)
+
+    assert ModelSpec.load(file_path) == model_fixture.to_spec(number_of_steps=20, seed=3)
+    assert model.migration_speed.keywords == {'half_saturation_parameter': 0.2}
+    assert np.allclose(model.result, model_fixture.result), "The model should be reproducible from its spec"
+
+
+def test_spec_and_model_can_be_pickled(model_fixture):
+    spec = model_fixture.to_spec()
+
+    assert pickle.loads(pickle.dumps(spec)) == spec
+    assert isinstance(pickle.loads(pickle.dumps(VerFishDModel.from_spec(spec))), VerFishDModel)
+
+
+def test_round_trip_the_dtype_through_a_spec(profile_fixture, tmp_path):
+    model = VerFishDModel('test', profile_fixture, linear_migration_speed, [Temperature('temperature', 1.0)], dtype=np.float32)
+    model.to_spec(number_of_steps=20).save(tmp_path / "model.toml")
+
+    restored = VerFishDModel.from_spec(tmp_path / "model.toml", simulate=True)
+
+    assert restored.dtype == np.float32
+    assert (restored.steps.dtypes == np.float32).all(), "The simulation should run in the stored dtype"
+
+
+def test_resolve_a_relative_profile_path_against_the_spec_file(model_fixture, tmp_path):
+    spec = model_fixture.to_spec()
+    (tmp_path / "profile.csv").write_text(Path(spec.profile['path']).read_text())
+    spec.profile['path'] = "profile.csv"
+    spec.save(tmp_path / "model.json")
+
+    model = VerFishDModel.from_spec(tmp_path / "model.json")
+
+    assert np.array_equal(model.stimuli_profile.depth, model_fixture.stimuli_profile.depth)
+
+
+def test_save_a_profile_read_from_a_relative_path_into_another_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(Path(__file__).parent)
+    profile = StimuliProfile.read_from_tabular_file(Path("fixtures") / "temperature_stimuli.csv")
+    model = VerFishDModel('test', profile, linear_migration_speed, [Temperature('temperature', 1.0)])
+    (tmp_path / "specs").mkdir()
+    model.to_spec().save(tmp_path / "specs" / "model.json")
+
+    monkeypatch.chdir(tmp_path)
+    restored = VerFishDModel.from_spec(Path("specs") / "model.json")
+
+    assert Path(profile.source['path']).is_absolute(), "The source should not depend on the working directory"
+    assert np.array_equal(restored.stimuli_profile.depth, profile.depth)
+
+
+def test_throw_when_the_migration_speed_is_a_lambda(profile_fixture):
+    model = VerFishDModel('test', profile_fixture, lambda x: x, [Temperature('temperature', 1.0)])
+
+    with pytest.raises(ValueError):
+        model.to_spec()
+
+
+def test_throw_when_the_profile_was_not_read_from_a_file(profile_fixture, migration_speed_fixture):
+    profile_fixture.add_entry(11.0, {'temperature': 3.0})
+    model = VerFishDModel('test', profile_fixture, migration_speed_with_demographic_noise, [Temperature('temperature', 1.0)])
+
+    with pytest.raises(ValueError):
+        model.to_spec()
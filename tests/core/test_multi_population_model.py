@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from verfishd import MultiPopulationModel, PhysicalFactor, VerFishDModel
+
+
+class Up(PhysicalFactor):
+    def _calculate(self, value: float) -> float:
+        return 0.5
+
+
+class Down(PhysicalFactor):
+    def _calculate(self, value: float) -> float:
+        return -0.5
+
+
+def make_factor(base: type[PhysicalFactor]) -> PhysicalFactor:
+    class Factor(base):
+        pass
+
+    return Factor('temperature', 1.0)
+
+
+@pytest.fixture
+def multi_population_model_fixture(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture, pressure_factor_fixture):
+    populations = {
+        'cod': [temperature_factor_fixture(1.0)],
+        'herring': [temperature_factor_fixture(0.4), pressure_factor_fixture(0.6)]
+    }
+    model = MultiPopulationModel('test', temperature_stimuli_fixture, migration_speed_fixture, populations)
+
+    return model, populations
+
+
+def test_weighted_sum_matches_the_single_population_model(multi_population_model_fixture, temperature_stimuli_fixture, migration_speed_fixture):
+    model, populations = multi_population_model_fixture
+
+    for population, factors in populations.items():
+        single_model = VerFishDModel(population, temperature_stimuli_fixture, migration_speed_fixture, factors)
+        assert np.allclose(model.weighted_sum[population], single_model.weighted_sum), f"Weighted sum of {population} should match"
+
+
+def test_simulation_matches_the_single_population_model(multi_population_model_fixture, temperature_stimuli_fixture, migration_speed_fixture):
+    model, populations = multi_population_model_fixture
+    model.simulate(30)
+
+    for population, factors in populations.items():
+        single_model = VerFishDModel(population, temperature_stimuli_fixture, migration_speed_fixture, factors)
+        single_model.simulate(30)
+
+        assert model.steps[population].shape == single_model.steps.shape, "Each population should record every step"
+        assert np.allclose(model.result[population], single_model.result), f"Result of {population} should match"
+
+
+def test_use_one_migration_speed_per_population(temperature_stimuli_fixture, temperature_factor_fixture):
+    model = MultiPopulationModel(
+        'test',
+        temperature_stimuli_fixture,
+        {'fast': lambda x: x, 'resting': lambda x: 0.0},
+        {'fast': [temperature_factor_fixture(1.0)], 'resting': [temperature_factor_fixture(1.0)]}
+    )
+    model.simulate(10)
+
+    assert (model.result['resting'] == 1.0).all(), "A population without migration should not move"
+    assert not (model.result['fast'] == 1.0).all(), "A migrating population should move"
+
+
+def test_do_not_share_responses_of_equally_named_classes(temperature_stimuli_fixture, migration_speed_fixture):
+    model = MultiPopulationModel(
+        'test',
+        temperature_stimuli_fixture,
+        migration_speed_fixture,
+        {'up': [make_factor(Up)], 'down': [make_factor(Down)]}
+    )
+
+    assert (model.weighted_sum['up'] == 0.5).all()
+    assert (model.weighted_sum['down'] == -0.5).all(), "Classes with different bases should be evaluated separately"
+
+
+def test_throw_when_a_population_has_invalid_weights(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture):
+    with pytest.raises(ValueError):
+        MultiPopulationModel('test', temperature_stimuli_fixture, migration_speed_fixture, {'cod': [temperature_factor_fixture(0.5)]})
+
+
+def test_simulate_in_single_precision(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture, pressure_factor_fixture):
+    populations = {
+        'cod': [temperature_factor_fixture(1.0)],
+        'herring': [temperature_factor_fixture(0.4), pressure_factor_fixture(0.6)]
+    }
+    model = MultiPopulationModel('test', temperature_stimuli_fixture, migration_speed_fixture, populations, dtype=np.float32)
+    reference = MultiPopulationModel('test', temperature_stimuli_fixture, migration_speed_fixture, populations)
+    model.simulate(30)
+    reference.simulate(30)
+
+    assert (model.result.dtypes == np.float32).all(), "The result should use the requested dtype"
+    assert np.allclose(model.result, reference.result, atol=1e-5), "Single precision should match double precision closely"
+
+
+def test_throw_on_non_floating_dtype(temperature_stimuli_fixture, migration_speed_fixture, temperature_factor_fixture):
+    with pytest.raises(TypeError):
+        MultiPopulationModel('test', temperature_stimuli_fixture, migration_speed_fixture, {'cod': [temperature_factor_fixture(1.0)]}, dtype=np.int32)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from multiprocessing.shared_memory import SharedMemory
+from verfishd import StimuliProfile, sweep_weights, migration_speed_with_demographic_noise
+
+
+def test_sweep_matches_separate_simulations(model_factory_fixture):
+    weights = [[0.2, 0.8], [0.5, 0.5], [0.9, 0.1]]
+
+    result = sweep_weights(model_factory_fixture(0.5), weights, number_of_steps=30, processes=2)
+
+    assert result.shape == (11, 3), "There should be one column per weight set"
+    for run, (temperature_weight, _) in enumerate(weights):
+        model = model_factory_fixture(temperature_weight)
+        model.simulate(30)
+        assert np.allclose(result[run], model.result), f"Run {run} should match a separate simulation"
+
+
+def test_sweep_a_single_precision_model(model_factory_fixture):
+    # Larger than a page of shared memory, so a wrongly sized block cannot hide in the padding
+    depth = np.arange(5000, dtype=np.float64)
+    profile = StimuliProfile(pd.DataFrame({
+        'depth': depth,
+        'temperature': 3.0 + 3.0 * np.sin(depth / 50.0),
+        'pressure': 970.0 + depth / 100.0
+    }))
+    weights = [[0.2, 0.8], [0.9, 0.1]]
+
+    result = sweep_weights(model_factory_fixture(0.5, profile=profile, dtype=np.float32), weights, number_of_steps=10, processes=2)
+
+    assert result.shape == (5000, 2)
+    for run, (temperature_weight, _) in enumerate(weights):
+        model = model_factory_fixture(temperature_weight, profile=profile)
+        model.simulate(10)
+        assert np.allclose(result[run], model.result, atol=1e-4), f"Run {run} should match a double precision simulation"
+
+
+def test_run_a_seeded_ensemble(model_factory_fixture):
+    model = model_factory_fixture(0.7, migration_speed_with_demographic_noise)
+
+    result = sweep_weights(model, [[0.7, 0.3]] * 2, number_of_steps=10, seeds=[1, 1], processes=2)
+
+    model.simulate(10, seed=1)
+    assert np.allclose(result[0], result[1]), "Runs with the same seed should be identical"
+    assert np.allclose(result[0], model.result), "A seeded run should match a seeded simulation"
+
+
+def test_draw_independent_runs_without_seeds(model_factory_fixture):
+    model = model_factory_fixture(0.7, migration_speed_with_demographic_noise)
+
+    result = sweep_weights(model, [[0.7, 0.3]] * 4, number_of_steps=10, processes=2)
+
+    runs = {tuple(result[run].round(12)) for run in result.columns}
+    assert len(runs) == 4, "Unseeded runs should not repeat the random draws of other workers"
+
+
+def test_release_the_shared_memory_when_an_allocation_fails(model_factory_fixture, monkeypatch):
+    created = []
+
+    def allocate(name=None, create=False, size=0):
+        if create and len(created) == 2:
+            raise MemoryError("Out of shared memory")
+        block = SharedMemory(name=name, create=create, size=size)
+        created.append(block.name)
+        return block
+
+    monkeypatch.setattr("verfishd.core.parallel_sweep.SharedMemory", allocate)
+
+    with pytest.raises(MemoryError):
+        sweep_weights(model_factory_fixture(0.5), [[0.5, 0.5]], number_of_steps=10, processes=1)
+
+    assert len(created) == 2
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
+
+
+@pytest.mark.parametrize("weights", [[[0.5, 0.4]], [[1.0]]])
+def test_throw_for_invalid_weight_sets(model_factory_fixture, weights):
+    with pytest.raises(ValueError):
+        sweep_weights(model_factory_fixture(0.5), weights)
@@ -1,6 +1,7 @@
 from pathlib import Path
 
 import pytest
+import numpy as np
 import pandas as pd
 
 from verfishd import StimuliProfile
@@ -33,6 +34,49 @@ def test_throw_an_error_when_add_entry_is_called_with_unknown_column(dataframe_s
         stimuli_profile.add_entry(3.5, {'pressure': 4.25})
 
 
+def test_extend_appends_many_rows_at_once(dataframe_stimuli_fixture):
+    stimuli_profile = StimuliProfile(dataframe_stimuli_fixture)
+    rows = len(stimuli_profile.depth)
+    stimuli_profile.extend(np.array([10.0, 11.0]), np.array([[3.5], [3.4]]))
+
+    assert len(stimuli_profile.data) == rows + 2, "StimuliProfile should append every row"
+    assert stimuli_profile.data['temperature'].loc[11.0] == 3.4
+    with pytest.raises(ValueError):
+        stimuli_profile.extend(np.array([12.0]), np.array([[3.3, 1.0]]))
+
+
+def test_data_is_a_copy_of_the_profile(dataframe_stimuli_fixture):
+    stimuli_profile = StimuliProfile(dataframe_stimuli_fixture)
+
+    data = stimuli_profile.data
+    data.loc[1.0, 'temperature'] = 99.0
+
+    assert stimuli_profile.column('temperature')[1] == 6.0, "Edits to the copy should not reach the profile"
+    assert stimuli_profile.data is not stimuli_profile.data, "Every access should return a new copy"
+
+
+def test_depth_and_values_are_read_only(dataframe_stimuli_fixture):
+    stimuli_profile = StimuliProfile(dataframe_stimuli_fixture)
+
+    with pytest.raises(ValueError):
+        stimuli_profile.values[0, 0] = 99.0
+    with pytest.raises(ValueError):
+        stimuli_profile.depth[0] = 99.0
+
+    assert np.shares_memory(stimuli_profile.values, stimuli_profile.column('temperature')), "values should not copy the store"
+
+
+def test_replace_the_data_with_the_setter(dataframe_stimuli_fixture):
+    stimuli_profile = StimuliProfile(dataframe_stimuli_fixture)
+    data = stimuli_profile.data.copy()
+    data['temperature'] = data['temperature'] + 1.0
+
+    stimuli_profile.data = data
+
+    assert np.array_equal(stimuli_profile.column('temperature'), [8.0, 7.0, 6.0, 5.5, 5.0, 4.9])
+    assert stimuli_profile.source is None, "An edited profile no longer matches its file"
+
+
 def test_throw_an_error_when_initialized_with_an_dataframe_without_depth():
     with pytest.raises(ValueError):
         StimuliProfile(pd.DataFrame({'temperature': [7.0, 6.0, 5.0, 4.5, 4.0, 3.9]}))
@@ -58,3 +102,65 @@ def test_add_stimuli(dataframe_stimuli_fixture, stimuli, expected_exception):
         stimuli_profile.add_stimuli(stimuli)
         assert 'oxygen' in stimuli_profile.data.columns
         assert (stimuli_profile.data['oxygen'] == stimuli).all()
+
+
+def test_column_returns_a_read_only_view_into_the_profile_values(dataframe_stimuli_fixture):
+    stimuli_profile = StimuliProfile(dataframe_stimuli_fixture)
+    column = stimuli_profile.column('temperature')
+
+    assert np.shares_memory(column, stimuli_profile.values), "column() should not copy the profile values"
+    assert column.flags.c_contiguous, "column() should return a contiguous array"
+    assert not column.flags.writeable, "column() should return a read-only view"
+    assert np.array_equal(column, dataframe_stimuli_fixture['temperature'].to_numpy())
+
+
+def test_throw_an_error_when_column_is_not_a_numeric_stimulus(dataframe_stimuli_fixture):
+    stimuli_profile = StimuliProfile(dataframe_stimuli_fixture.assign(station=['A'] * 6))
+    with pytest.raises(ValueError):
+        stimuli_profile.column('station')
+
+    assert stimuli_profile.data['station'].to_list() == ['A'] * 6, "Non-numeric columns should be kept in the DataFrame"
+
+
+def test_save_and_memory_map_a_profile_from_npy_files(dataframe_stimuli_fixture, tmp_path):
+    StimuliProfile(dataframe_stimuli_fixture).save_npy(tmp_path)
+    stimuli_profile = StimuliProfile.load_npy(tmp_path)
+
+    assert isinstance(stimuli_profile.values, np.memmap), "Profile values should be memory-mapped"
+    assert stimuli_profile.columns.to_list() == ['depth', 'temperature']
+    assert np.array_equal(stimuli_profile.data['temperature'], dataframe_stimuli_fixture['temperature'])
+
+
+@pytest.mark.parametrize("file_type", ["parquet", "feather"])
+def test_read_only_the_requested_columns_from_a_columnar_file(file_type, tmp_path):
+    pytest.importorskip("pyarrow")
+    file_path = tmp_path / f"profile.{file_type}"
+    dataframe = pd.DataFrame({
+        'depth': [0.0, 1.0, 2.0],
+        'temperature': [7.0, 6.0, 5.0],
+        'salinity': [30.0, 31.0, 32.0]
+    })
+    getattr(dataframe, f"to_{file_type}")(file_path)
+
+    stimuli_profile = StimuliProfile.read_from_tabular_file(file_path, file_type, columns=['temperature'])
+
+    assert stimuli_profile.columns.to_list() == ['depth', 'temperature'], "Only the projected columns should be loaded"
+
+
+def test_create_a_profile_from_a_netcdf_file(tmp_path):
+    xr = pytest.importorskip("xarray")
+    file_path = tmp_path / "profile.nc"
+    dataset = xr.Dataset(
+        {
+            'temperature': (('time', 'z'), [[7.0, 6.0, 5.0]]),
+            'salinity': (('time', 'z'), [[30.0, 31.0, 32.0]])
+        },
+        coords={'time': [0], 'z': ('z', [0.0, 1.0, 2.0], {'standard_name': 'depth', 'positive': 'down'})}
+    )
+    dataset.to_netcdf(file_path)
+
+    stimuli_profile = StimuliProfile.read_from_netcdf(file_path, columns=['temperature'])
+
+    assert stimuli_profile.columns.to_list() == ['depth', 'temperature']
+    assert np.array_equal(stimuli_profile.depth, [0.0, 1.0, 2.0])
+    assert np.array_equal(stimuli_profile.column('temperature'), [7.0, 6.0, 5.0])
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from verfishd import StimuliProfile, simulate_profiles
+
+
+def test_yield_simulated_models_in_input_order(profile_files_fixture, build_model_fixture):
+    results = list(simulate_profiles(profile_files_fixture, build_model_fixture, 10, reader=StimuliProfile.read_from_tabular_file))
+
+    assert [source for source, _ in results] == profile_files_fixture, "Results should be yielded in input order"
+    for source, model in results:
+        expected = build_model_fixture(StimuliProfile.read_from_tabular_file(source))
+        expected.simulate(10)
+        assert np.allclose(model.result, expected.result), "The pipeline should simulate every profile"
+
+
+def test_yield_results_in_completion_order(profile_files_fixture, build_model_fixture):
+    def slow_first_reader(file_path):
+        if file_path == profile_files_fixture[0]:
+            time.sleep(0.2)
+        return StimuliProfile.read_from_tabular_file(file_path)
+
+    sources = [source for source, _ in simulate_profiles(profile_files_fixture, build_model_fixture, 1, reader=slow_first_reader, prefetch=3, order="completion")]
+
+    assert sorted(sources) == sorted(profile_files_fixture), "Every profile should be simulated"
+    assert sources[0] != profile_files_fixture[0], "A slow profile should not block faster ones"
+
+
+def test_only_read_ahead_as_many_files_as_prefetched(profile_files_fixture, build_model_fixture):
+    started = []
+    lock = threading.Lock()
+
+    def counting_reader(file_path):
+        with lock:
+            started.append(file_path)
+        return StimuliProfile.read_from_tabular_file(file_path)
+
+    results = simulate_profiles(profile_files_fixture, build_model_fixture, 1, reader=counting_reader, prefetch=2)
+    next(results)
+
+    assert len(started) <= 3, "At most prefetch files should be parsed ahead of the current one"
+    results.close()
+
+
+def test_throw_when_prefetch_is_smaller_than_one(profile_files_fixture, build_model_fixture):
+    with pytest.raises(ValueError):
+        next(simulate_profiles(profile_files_fixture, build_model_fixture, prefetch=0))
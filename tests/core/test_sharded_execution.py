@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fixtures.physical_factor_fixtures import Temperature
+from verfishd import StimuliProfile, VerFishDModel, WorkQueue, linear_migration_speed, merge_shards, run_sharded, run_worker
+
+
+@pytest.fixture
+def spec(profile_files_fixture):
+    model = VerFishDModel('test', StimuliProfile.read_from_tabular_file(profile_files_fixture[0]), linear_migration_speed, [Temperature('temperature', 1.0)])
+    return model.to_spec(number_of_steps=10)
+
+
+def expected_result(source):
+    model = VerFishDModel('test', StimuliProfile.read_from_tabular_file(source), linear_migration_speed, [Temperature('temperature', 1.0)])
+    model.simulate(10)
+    return model.result.to_numpy()
+
+
+def test_simulate_every_profile_with_several_workers(profile_files_fixture, spec, tmp_path):
+    merged = run_sharded(profile_files_fixture, spec, tmp_path / "output", processes=2, shard_size=2, heartbeat_interval=0.1)
+
+    assert sorted(merged['source'].unique()) == sorted(profile_files_fixture)
+    for source in profile_files_fixture:
+        result = merged[merged['source'] == source]
+        assert np.allclose(result['Fish Probability'], expected_result(source)), f"{source} should be simulated with the spec"
+
+    with WorkQueue(tmp_path / "output" / "queue.sqlite") as queue:
+        assert queue.counts()['done'] == len(profile_files_fixture)
+
+
+def test_take_over_the_tasks_of_a_crashed_worker(profile_files_fixture, spec, tmp_path):
+    queue_path = tmp_path / "queue.sqlite"
+    with WorkQueue(queue_path) as queue:
+        queue.enqueue(profile_files_fixture)
+        lost = queue.claim('crashed')
+
+    processed = run_worker(queue_path, spec, tmp_path / "output", worker='survivor', heartbeat_interval=0.05, heartbeat_timeout=0.2)
+
+    assert processed == len(profile_files_fixture), "The survivor should simulate the task of the crashed worker as well"
+    assert lost.source in set(merge_shards(tmp_path / "output")['source'])
+
+
+def test_record_failing_profiles(profile_files_fixture, spec, tmp_path):
+    queue_path = tmp_path / "queue.sqlite"
+    with WorkQueue(queue_path) as queue:
+        queue.enqueue([*profile_files_fixture[:2], str(tmp_path / "missing.csv")])
+
+    processed = run_worker(queue_path, spec, tmp_path / "output", heartbeat_interval=0.05, max_attempts=2)
+
+    with WorkQueue(queue_path) as queue:
+        assert processed == 2
+        assert list(queue.failed()) == [str(tmp_path / "missing.csv")]
+
+
+def test_keep_one_copy_of_profiles_written_twice(tmp_path):
+    first = pd.DataFrame({'source': ['a', 'a', 'b'], 'depth': [0.0, 1.0, 0.0], 'Fish Probability': [1.0, 2.0, 3.0]})
+    second = pd.DataFrame({'source': ['a', 'a'], 'depth': [0.0, 1.0], 'Fish Probability': [1.5, 2.5]})
+    (tmp_path / "output").mkdir()
+    first.to_csv(tmp_path / "output" / "worker-1.csv", index=False)
+    second.to_csv(tmp_path / "output" / "worker-2.csv", index=False)
+
+    merged = merge_shards(tmp_path / "output", tmp_path / "merged.csv")
+
+    assert merged.equals(first), "Only the first copy of a profile should be kept"
+    assert pd.read_csv(tmp_path / "merged.csv").equals(first)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from verfishd import SimulationCache, migration_speed_with_demographic_noise
+from verfishd.core.simulation_cache import fingerprint
+
+SPEED_SCALE = 1.0
+
+
+def scaled_migration_speed(x):
+    return SPEED_SCALE * x
+
+
+def test_return_the_cached_steps_for_identical_inputs(model_factory_fixture, monkeypatch):
+    cache = SimulationCache()
+    model = model_factory_fixture()
+    model.simulate(30, cache=cache)
+
+    cached_model = model_factory_fixture()
+    monkeypatch.setattr("verfishd.core.model.run_migration_steps", lambda *args: pytest.fail("The cache should be used"))
+    cached_model.simulate(30, cache=cache)
+
+    assert len(cache) == 1, "Identical inputs should share one cache entry"
+    assert cached_model.steps.equals(model.steps), "A cache hit should restore all steps"
+    assert cached_model.result.equals(model.result), "A cache hit should restore the result"
+
+
+def test_different_inputs_should_not_share_a_cache_entry(model_factory_fixture):
+    cache = SimulationCache()
+    model_factory_fixture().simulate(10, cache=cache)
+    model_factory_fixture().simulate(11, cache=cache)
+    model_factory_fixture(migration_speed=lambda x: x / 2).simulate(10, cache=cache)
+
+    assert len(cache) == 3, "Each distinct configuration should get its own cache entry"
+
+
+def test_cache_results_on_disk(model_factory_fixture, tmp_path):
+    model = model_factory_fixture()
+    model.simulate(10, cache=SimulationCache(directory=tmp_path))
+
+    cached_model = model_factory_fixture()
+    cache = SimulationCache(directory=tmp_path)
+    assert len(cache) == 0, "A new cache should start with an empty memory"
+
+    cached_model.simulate(10, cache=cache)
+
+    assert len(list(tmp_path.glob("*.npy"))) == 1, "The result should be persisted on disk"
+    assert cached_model.result.equals(model.result), "The result should be loaded from disk"
+
+
+def test_changed_globals_should_not_share_a_cache_entry(model_factory_fixture, monkeypatch):
+    cache = SimulationCache()
+    model = model_factory_fixture(migration_speed=scaled_migration_speed)
+    model.simulate(10, cache=cache)
+
+    monkeypatch.setattr(f"{__name__}.SPEED_SCALE", 0.5)
+    changed_model = model_factory_fixture(migration_speed=scaled_migration_speed)
+    changed_model.simulate(10, cache=cache)
+
+    uncached_model = model_factory_fixture(migration_speed=scaled_migration_speed)
+    uncached_model.simulate(10)
+
+    assert len(cache) == 2, "A changed global read by the migration speed should change the cache key"
+    assert changed_model.result.equals(uncached_model.result)
+
+
+def test_evict_the_least_recently_used_result(model_factory_fixture):
+    cache = SimulationCache(maxsize=1)
+    model_factory_fixture().simulate(10, cache=cache)
+    model_factory_fixture().simulate(20, cache=cache)
+
+    assert len(cache) == 1, "The cache should not grow beyond maxsize"
+
+
+def test_refuse_to_cache_a_stochastic_migration_speed_without_seed(model_factory_fixture):
+    model = model_factory_fixture(migration_speed=migration_speed_with_demographic_noise)
+
+    with pytest.raises(ValueError):
+        model.simulate(10, cache=SimulationCache())
+
+
+def test_cache_a_stochastic_migration_speed_with_seed(model_factory_fixture):
+    cache = SimulationCache()
+    model = model_factory_fixture(migration_speed=migration_speed_with_demographic_noise)
+    model.simulate(10, seed=42, cache=cache)
+
+    uncached_model = model_factory_fixture(migration_speed=migration_speed_with_demographic_noise)
+    uncached_model.simulate(10, seed=42)
+
+    assert len(cache) == 1
+    assert np.allclose(model.result, uncached_model.result), "A seeded simulation should be reproducible"
+
+
+def test_fingerprint_only_plain_data():
+    assert fingerprint(np.arange(3.0), [1, 'a'], {'b': None}) == fingerprint(np.arange(3.0), [1, 'a'], {'b': None})
+    assert fingerprint(np.arange(3.0)) != fingerprint(np.arange(3.0, dtype=np.float32))
+
+    with pytest.raises(TypeError):
+        fingerprint(scaled_migration_speed)
@@ -0,0 +1,76 @@
+import numpy as np
+import pickle
+import pytest
+from verfishd import PhysicalFactor, TabulatedFactor, MemoizedFactor, VerFishDModel
+
+
+class CountingFactor(PhysicalFactor):
+    def __init__(self, weight: float):
+        super().__init__("temperature", weight)
+        self.calls = 0
+
+    def _calculate(self, value: float) -> float:
+        self.calls += 1
+        return float(np.tanh(value - 5.0))
+
+
+def test_interpolate_within_the_reported_error():
+    factor = CountingFactor(1.0)
+    tabulated = TabulatedFactor(factor, 0.0, 20.0, resolution=201)
+    values = np.linspace(0.0, 20.0, 1000)
+
+    error = np.max(np.abs(tabulated.calculate_many(values) - factor.calculate_many(values)))
+
+    assert tabulated.max_interpolation_error < 1e-3, "A fine table should be accurate"
+    assert error <= tabulated.max_interpolation_error + 1e-12, "The reported error should bound the actual error"
+
+
+def test_fall_back_to_the_wrapped_factor_outside_the_table():
+    factor = CountingFactor(1.0)
+    tabulated = TabulatedFactor(factor, 0.0, 10.0, resolution=11)
+
+    assert tabulated.calculate(25.0) == factor.calculate(25.0), "Values outside the table should be exact"
+    assert tabulated.calculate_many(np.array([-5.0]))[0] == factor.calculate(-5.0)
+
+
+def test_tabulated_factor_matches_the_model_of_the_wrapped_factor(temperature_stimuli_fixture, temperature_factor_fixture, migration_speed_fixture):
+    factor = temperature_factor_fixture(1.0)
+    tabulated = TabulatedFactor.from_profile(factor, temperature_stimuli_fixture, resolution=2001)
+
+    model = VerFishDModel('test', temperature_stimuli_fixture, migration_speed_fixture, [factor])
+    tabulated_model = VerFishDModel('test', temperature_stimuli_fixture, migration_speed_fixture, [tabulated])
+
+    assert tabulated.name == factor.name and tabulated.weight == factor.weight
+    assert np.allclose(model.weighted_sum, tabulated_model.weighted_sum, atol=1e-2)
+
+
+def test_memoized_factor_evaluates_every_distinct_value_once():
+    factor = CountingFactor(1.0)
+    memoized = MemoizedFactor(factor, maxsize=16)
+    values = np.array([1.0, 2.0, 1.0, 2.0, 3.0])
+
+    first = memoized.calculate_many(values)
+    second = memoized.calculate_many(values)
+
+    assert factor.calls == 3, "Repeated values should be served from the cache"
+    assert np.array_equal(first, second)
+    assert np.array_equal(first, [np.tanh(v - 5.0) for v in values])
+    assert memoized.max_interpolation_error == 0.0
+
+
+def test_pickle_a_memoized_factor_without_its_cache():
+    memoized = MemoizedFactor(CountingFactor(1.0), maxsize=16)
+    values = np.array([1.0, 2.0, 1.0])
+    expected = memoized.calculate_many(values)
+
+    restored = pickle.loads(pickle.dumps(memoized))
+
+    assert restored.maxsize == 16 and restored.factor.calls == 2
+    assert restored.cache_info().currsize == 0, "The cache should not be pickled"
+    assert np.array_equal(restored.calculate_many(values), expected)
+    assert restored.cache_info().misses == 2, "The restored factor should build a new cache"
+
+
+def test_throw_when_the_table_range_is_empty():
+    with pytest.raises(ValueError):
+        TabulatedFactor(CountingFactor(1.0), 1.0, 1.0)
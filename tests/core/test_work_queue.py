@@ -0,0 +1,55 @@
+import time
+
+import pytest
+from verfishd import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    with WorkQueue(tmp_path / "queue.sqlite", heartbeat_timeout=0.05, max_attempts=2) as queue:
+        yield queue
+
+
+def test_hand_out_every_task_once(queue):
+    assert queue.enqueue(['a.cnv', 'b.cnv']) == 2
+    assert queue.enqueue(['b.cnv', 'c.cnv']) == 1, "Queued files should be skipped"
+
+    claimed = [queue.claim('worker'), queue.claim('worker'), queue.claim('worker')]
+
+    assert [task.source for task in claimed] == ['a.cnv', 'b.cnv', 'c.cnv']
+    assert queue.claim('worker') is None, "No task should be handed out twice"
+    assert queue.complete([task.id for task in claimed], 'worker') == 3
+    assert queue.counts() == {'pending': 0, 'claimed': 0, 'done': 3, 'failed': 0}
+
+
+def test_share_the_queue_between_connections(queue):
+    queue.enqueue(['a.cnv', 'b.cnv'])
+
+    with WorkQueue(queue.file_path) as other:
+        first, second = queue.claim('first'), other.claim('second')
+
+    assert {first.source, second.source} == {'a.cnv', 'b.cnv'}
+
+
+def test_requeue_claims_without_heartbeat(queue):
+    queue.enqueue(['a.cnv'])
+    stale = queue.claim('crashed')
+
+    queue.heartbeat('crashed')
+    assert queue.claim('worker') is None, "A claim with a recent heartbeat should be kept"
+
+    time.sleep(0.1)
+    task = queue.claim('worker')
+
+    assert task is not None and task.id == stale.id and task.attempts == 2, "The stale claim should be handed out again"
+    assert queue.complete([stale.id], 'crashed') == 0, "The stale worker should not complete a task it lost"
+
+
+def test_fail_a_task_after_max_attempts(queue):
+    queue.enqueue(['broken.cnv'])
+
+    queue.fail(queue.claim('worker').id, 'worker', 'ValueError: broken')
+    queue.fail(queue.claim('worker').id, 'worker', 'ValueError: broken')
+
+    assert queue.claim('worker') is None
+    assert queue.failed() == {'broken.cnv': 'ValueError: broken'}
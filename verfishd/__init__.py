@@ -1,8 +1,22 @@
-from .core import PhysicalFactor, StimuliProfile, VerFishDModel, migration_speed_with_demographic_noise
+from .core import PhysicalFactor, TabulatedFactor, MemoizedFactor, StimuliProfile, VerFishDModel, MultiPopulationModel, migration_speed_with_demographic_noise, linear_migration_speed, ModelSpec, SimulationCache, simulate_profiles, sweep_weights, CNVTail, follow_cnv, WorkQueue, run_worker, run_sharded, merge_shards
 
 __all__ = [
     'PhysicalFactor',
+    'TabulatedFactor',
+    'MemoizedFactor',
     'StimuliProfile',
     'VerFishDModel',
-    'migration_speed_with_demographic_noise'
+    'MultiPopulationModel',
+    'migration_speed_with_demographic_noise',
+    'linear_migration_speed',
+    'ModelSpec',
+    'SimulationCache',
+    'simulate_profiles',
+    'sweep_weights',
+    'CNVTail',
+    'follow_cnv',
+    'WorkQueue',
+    'run_worker',
+    'run_sharded',
+    'merge_shards'
 ]
@@ -1,4 +1,13 @@
 from .physical_factor import PhysicalFactor
+from .tabulated_factor import TabulatedFactor, MemoizedFactor
 from .model import VerFishDModel
+from .multi_population_model import MultiPopulationModel
 from .physical_stimuli_profile import StimuliProfile
-from .migration_speed import migration_speed_with_demographic_noise
+from .migration_speed import migration_speed_with_demographic_noise, linear_migration_speed
+from .simulation_cache import SimulationCache
+from .pipeline import simulate_profiles
+from .parallel_sweep import sweep_weights
+from .model_spec import ModelSpec
+from .cnv_tail import CNVTail, follow_cnv
+from .work_queue import WorkQueue
+from .sharded_execution import run_worker, run_sharded, merge_shards
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .migration_kernel import apply_operator, migration_operator
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class CalibrationResult:
+    """
+    The outcome of a weight calibration.
+
+    Attributes
+    ----------
+    weights : np.ndarray
+        The fitted factor weights. They are non-negative and sum to 1.
+    loss : float
+        The loss of the fitted weights.
+    iterations : int
+        The number of optimizer iterations.
+    converged : bool
+        Whether the optimization stopped before reaching the maximum number of iterations.
+    prediction : Any
+        The simulated distribution for the fitted weights.
+    """
+
+    weights: np.ndarray
+    loss: float
+    iterations: int
+    converged: bool
+    prediction: Any
+
+
+def mse_loss(predicted: np.ndarray, observed: np.ndarray) -> tuple[float, np.ndarray]:
+    """
+    The mean squared error between the predicted and the observed fish share per depth.
+
+    Both distributions are normalized to a total of 1 before they are compared.
+
+    Returns
+    -------
+    tuple of float and np.ndarray
+        The loss and its gradient with respect to the predicted distribution.
+    """
+    total = predicted.sum()
+    difference = predicted / total - observed / observed.sum()
+    loss = float(np.mean(difference ** 2))
+
+    # The population is conserved, so the total is constant with respect to the weights
+    return loss, 2.0 * difference / (difference.size * total)
+
+
+def kl_loss(predicted: np.ndarray, observed: np.ndarray, epsilon: float = 1e-12) -> tuple[float, np.ndarray]:
+    """
+    The Kullback-Leibler divergence of the predicted from the observed fish distribution.
+
+    Both distributions are normalized to a total of 1 before they are compared.
+
+    Returns
+    -------
+    tuple of float and np.ndarray
+        The loss and its gradient with respect to the predicted distribution.
+    """
+    observed = observed / observed.sum()
+    predicted_share = predicted / predicted.sum() + epsilon
+    support = observed > 0
+    loss = float(np.sum(observed[support] * np.log(observed[support] / predicted_share[support])))
+
+    return loss, -observed / (predicted_share * predicted.sum())
+
+
+LOSSES: dict[str, Callable[[np.ndarray, np.ndarray], tuple[float, np.ndarray]]] = {
+    "mse": mse_loss,
+    "kl": kl_loss
+}
+
+
+def observed_on_depths(observed: pd.Series | np.ndarray, depth: np.ndarray) -> np.ndarray:
+    """
+    Bring an observed distribution onto the depths of a stimuli profile.
+
+    Parameters
+    ----------
+    observed : pd.Series or np.ndarray
+        A series indexed by depth, which is linearly interpolated, or an array with one value per depth.
+    depth : np.ndarray
+        The depths of the stimuli profile.
+
+    Raises
+    ------
+    ValueError
+        If an array does not have one value per depth.
+
+    Returns
+    -------
+    np.ndarray
+        The observed distribution for every depth.
+    """
+    if isinstance(observed, pd.Series):
+        observed = observed.sort_index()
+        return np.interp(depth, observed.index.to_numpy(dtype=np.float64), observed.to_numpy(dtype=np.float64))
+
+    observed = np.asarray(observed, dtype=np.float64)
+    if observed.shape != depth.shape:
+        raise ValueError(f"The observation must have one value per depth ({depth.size}), but got {observed.size}.")
+
+    return observed
+
+
+def calibrate(
+        factor_responses: np.ndarray,
+        weights: np.ndarray,
+        migration_speed: Callable[[float], float],
+        initial: np.ndarray,
+        observed: np.ndarray,
+        loss: str | Callable[[np.ndarray, np.ndarray], tuple[float, np.ndarray]] = "mse",
+        number_of_steps: int = 1000,
+        max_iterations: int = 200,
+        tolerance: float = 1e-10,
+        seed: Optional[int] = None
+) -> CalibrationResult:
+    """
+    Fit factor weights to an observed distribution by gradient descent.
+
+    The weights are parametrized as ``softmax(theta)``, which keeps them non-negative and summing to 1.
+    The loss gradient is computed exactly for the step loop with its adjoint (reverse mode), while the
+    derivative of the migration speed is taken by central differences.
+
+    Parameters
+    ----------
+    factor_responses : np.ndarray
+        The unweighted factor responses with shape (factors, depth).
+    weights : np.ndarray
+        The initial factor weights.
+    migration_speed : Callable[[float], float]
+        The migration speed function.
+    initial : np.ndarray
+        The fish distribution the simulation starts from.
+    observed : np.ndarray
+        The observed distribution for every depth.
+    loss : str or Callable, optional
+        'mse', 'kl' or a function returning the loss and its gradient for the predicted and observed distribution.
+    number_of_steps : int, optional
+        The number of simulation steps.
+    max_iterations : int, optional
+        The maximum number of optimizer iterations.
+    tolerance : float, optional
+        The optimization stops once the loss improves by less than this value.
+    seed : int, optional
+        Seed which is set before every evaluation of the migration speed.
+
+    Raises
+    ------
+    ValueError
+        If the loss is unknown or the migration speed is not deterministic.
+
+    Returns
+    -------
+    CalibrationResult
+        The fitted weights, the final loss and the simulated distribution.
+    """
+    factor_responses = np.asarray(factor_responses, dtype=np.float64)
+    initial = np.asarray(initial, dtype=np.float64)
+
+    if isinstance(loss, str):
+        if loss not in LOSSES:
+            raise ValueError(f"Unknown loss '{loss}'. Use one of {list(LOSSES)} or a callable.")
+        loss = LOSSES[loss]
+
+    def speed(weighted_sum: np.ndarray) -> np.ndarray:
+        if seed is not None:
+            np.random.seed(seed)
+        return np.vectorize(migration_speed, otypes=[np.float64])(weighted_sum)
+
+    probe = factor_responses.T @ weights
+    if not np.array_equal(speed(probe), speed(probe)):
+        raise ValueError("The migration speed is non-deterministic. Supply a seed to calibrate the model.")
+
+    def evaluate(theta: np.ndarray) -> tuple[float, np.ndarray, np.ndarray]:
+        current_weights = _softmax(theta)
+        weighted_sum = factor_responses.T @ current_weights
+        migration_speeds = speed(weighted_sum)
+
+        states = _forward(initial, migration_speeds, number_of_steps)
+        value, gradient = loss(states[-1], observed)
+        speed_gradient = _adjoint(states, migration_speeds, gradient)
+
+        # Chain rule: migration speed -> weighted sum -> weights -> theta
+        step = 1e-6
+        slope = (speed(weighted_sum + step) - speed(weighted_sum - step)) / (2 * step)
+        weight_gradient = factor_responses @ (speed_gradient * slope)
+        theta_gradient = current_weights * (weight_gradient - current_weights @ weight_gradient)
+
+        return value, theta_gradient, states[-1]
+
+    theta = np.log(np.clip(weights, 1e-6, None))
+    value, gradient, prediction = evaluate(theta)
+    # The first step changes theta by at most 1, whatever the scale of the loss
+    learning_rate = 1.0 / max(np.abs(gradient).max(), 1e-12)
+    converged = False
+    iteration = 0
+
+    while iteration < max_iterations:
+        iteration += 1
+
+        # Backtracking line search with the Armijo condition
+        while learning_rate * np.abs(gradient).max() > 1e-12:
+            candidate = theta - learning_rate * gradient
+            candidate_value, candidate_gradient, candidate_prediction = evaluate(candidate)
+            if candidate_value <= value - 1e-4 * learning_rate * gradient @ gradient:
+                break
+            learning_rate /= 2
+        else:
+            converged = True
+            break
+
+        improvement = value - candidate_value
+        theta, value, gradient, prediction = candidate, candidate_value, candidate_gradient, candidate_prediction
+        learning_rate *= 2
+
+        if improvement < tolerance:
+            converged = True
+            break
+
+    return CalibrationResult(
+        weights=_softmax(theta),
+        loss=value,
+        iterations=iteration,
+        converged=converged,
+        prediction=prediction
+    )
+
+
+def _softmax(theta: np.ndarray) -> np.ndarray:
+    exponential = np.exp(theta - theta.max())
+    return exponential / exponential.sum()
+
+
+def _forward(initial: np.ndarray, migration_speeds: np.ndarray, number_of_steps: int) -> np.ndarray:
+    """
+    Run the step loop as ``x + A x`` and keep every state for the adjoint.
+
+    Returns
+    -------
+    np.ndarray
+        The states x_0 to x_N with shape (number_of_steps + 1, depth).
+    """
+    operator = migration_operator(migration_speeds)
+    states = np.empty((number_of_steps + 1, initial.size))
+    states[0] = initial
+
+    for step in range(number_of_steps):
+        states[step + 1] = states[step] + apply_operator(operator, states[step])
+
+    return states
+
+
+def _adjoint(states: np.ndarray, migration_speeds: np.ndarray, gradient: np.ndarray) -> np.ndarray:
+    """
+    Propagate the loss gradient backward through the step loop.
+
+    Parameters
+    ----------
+    states : np.ndarray
+        The states x_0 to x_N of the forward run.
+    migration_speeds : np.ndarray
+        The migration speed for each depth.
+    gradient : np.ndarray
+        The gradient of the loss with respect to x_N.
+
+    Returns
+    -------
+    np.ndarray
+        The gradient of the loss with respect to the migration speed of each depth.
+    """
+    lower, diagonal, upper = migration_operator(migration_speeds)
+    transposed = (upper, diagonal, lower)
+    number_of_steps = states.shape[0] - 1
+
+    # adjoints[n] is the gradient with respect to x_(n + 1)
+    adjoints = np.empty((number_of_steps, states.shape[1]))
+    adjoint = gradient
+    for step in range(number_of_steps - 1, -1, -1):
+        adjoints[step] = adjoint
+        adjoint = adjoint + apply_operator(transposed, adjoint)
+
+    previous = states[:-1]
+    speed_gradient = np.zeros(migration_speeds.size)
+
+    # Fish moving up from depth i change x_(i - 1) by +w_i x_i and x_i by -w_i x_i
+    up = migration_speeds[1:] > 0
+    speed_gradient[1:] += up * np.sum(previous[:, 1:] * (adjoints[:, :-1] - adjoints[:, 1:]), axis=0)
+
+    # Fish moving down from depth i change x_(i + 1) by -w_i x_i and x_i by +w_i x_i
+    down = migration_speeds[:-1] < 0
+    speed_gradient[:-1] -= down * np.sum(previous[:, :-1] * (adjoints[:, 1:] - adjoints[:, :-1]), axis=0)
+
+    return speed_gradient
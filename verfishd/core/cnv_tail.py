@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import json
+import numpy as np
+import os
+import pandas as pd
+import re
+import time
+
+from .model import VerFishDModel
+from .physical_stimuli_profile import StimuliProfile
+from collections.abc import Callable, Iterator
+from importlib import resources
+from os import PathLike
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, cast
+
+# Seabird CNV files right-align every value in a field of 11 characters
+FIELD_WIDTH = 11
+
+_NAME_PATTERN = re.compile(r"#\s*name\s+(?P<id>\d+)\s*=\s*(?P<name>[^:]*):")
+_BAD_FLAG_PATTERN = re.compile(r"#\s*bad_flag\s*=\s*(?P<value>\S+)")
+
+
+class CNVTail:
+    """
+    Read a Seabird CNV file incrementally while it is still being written during a cast.
+
+    Every ``poll`` only reads the bytes appended since the previous call. Complete scan lines are
+    parsed in bulk and appended to ``profile``, an incomplete last line is kept until it is finished.
+    Channels are named like ``StimuliProfile.read_from_cnv`` names them, and the depth is the scan
+    number unless the file has a 'depth' channel.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the CNV file. It does not need to exist yet.
+    columns : Sequence of str, optional
+        The stimuli columns to keep in addition to 'depth'. By default, all sensor channels are kept.
+    """
+
+    profile: Optional[StimuliProfile]
+
+    def __init__(self, file_path: str | PathLike[str], columns: Optional[Sequence[str]] = None):
+        self.file_path = Path(file_path)
+        self.columns = None if columns is None else list(columns)
+        self.profile = None
+        self._offset = 0
+        self._buffer = b""
+        self._header: List[str] = []
+        self._names: Optional[List[str]] = None
+        self._bad_flag: Optional[float] = None
+        self._scans = 0
+
+    @property
+    def header_complete(self) -> bool:
+        """
+        Whether the header up to '*END*' has been read.
+        """
+        return self._names is not None
+
+    def poll(self) -> int:
+        """
+        Read the scans appended to the file since the last call.
+
+        Raise
+        -----
+        ValueError
+            If a requested column is not in the file or a scan line has the wrong number of fields.
+
+        Returns
+        -------
+        int
+            The number of new rows appended to ``profile``.
+        """
+        if not self.file_path.exists():
+            return 0
+
+        with open(self.file_path, 'rb') as file:
+            file.seek(self._offset)
+            appended = file.read()
+        self._offset += len(appended)
+
+        # Only complete lines are parsed, the rest waits for the next poll
+        self._buffer += appended
+        end = self._buffer.rfind(b"\n") + 1
+        lines, self._buffer = self._buffer[:end].splitlines(), self._buffer[end:]
+
+        if not self.header_complete:
+            lines = self.__read_header(lines)
+            if not self.header_complete:
+                return 0
+
+        lines = [line.rstrip() for line in lines if line.strip()]
+        if not lines:
+            return 0
+
+        return self.__append(self.__parse(lines))
+
+    def __read_header(self, lines: List[bytes]) -> List[bytes]:
+        """
+        Collect the channel names and the bad flag and return the lines after '*END*'.
+        """
+        for index, line in enumerate(lines):
+            text = line.decode('latin1')
+            if text.strip() != '*END*':
+                self._header.append(text)
+                continue
+
+            names: Dict[int, str] = {}
+            for entry in self._header:
+                if match := _NAME_PATTERN.match(entry):
+                    names[int(match['id'])] = match['name'].strip()
+                elif match := _BAD_FLAG_PATTERN.match(entry):
+                    self._bad_flag = float(match['value'])
+
+            refnames = _reference_names()
+            self._names = [refnames.get(names[key], names[key]) for key in sorted(names)]
+            self._header = []
+
+            missing = [column for column in self.columns or [] if column not in self._names]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in file. Available columns: {self._names}")
+
+            return lines[index + 1:]
+
+        return []
+
+    def __parse(self, lines: List[bytes]) -> np.ndarray:
+        """
+        Parse scan lines into an array with one column per channel.
+        """
+        channels = len(cast(List[str], self._names))
+
+        if all(len(line) == channels * FIELD_WIDTH for line in lines):
+            # Fixed-width fields can be converted without splitting every line in Python
+            fields = np.frombuffer(b"".join(lines), dtype=f"S{FIELD_WIDTH}")
+        else:
+            fields = np.array(b" ".join(lines).split())
+
+        if fields.size != len(lines) * channels:
+            raise ValueError(f"Every scan line must have {channels} values.")
+
+        scans = fields.astype(np.float64).reshape(len(lines), channels)
+        if self._bad_flag is not None:
+            scans[np.isclose(scans, self._bad_flag, rtol=0, atol=1e-30)] = np.nan
+
+        return scans
+
+    def __append(self, scans: np.ndarray) -> int:
+        """
+        Append parsed scans to the profile, creating it on the first scans.
+        """
+        names = cast(List[str], self._names)
+        # Like `read_from_cnv`, the first channel of a repeated name is used
+        positions = {name: names.index(name) for name in names}
+        if 'depth' in positions:
+            depth = scans[:, positions['depth']]
+        else:
+            depth = np.arange(self._scans, self._scans + scans.shape[0], dtype=np.float64)
+        self._scans += scans.shape[0]
+
+        if self.profile is None:
+            columns = [name for name in positions if name != 'depth'] if self.columns is None else self.columns
+            self.profile = StimuliProfile(pd.DataFrame({
+                'depth': depth,
+                **{column: scans[:, positions[column]] for column in columns}
+            }))
+        else:
+            self.profile.extend(depth, scans[:, [positions[column] for column in self.profile.stimuli]])
+
+        self.profile.source = {'path': os.path.abspath(self.file_path), 'format': 'cnv'}
+        if self.columns is not None:
+            self.profile.source['columns'] = list(self.columns)
+
+        return scans.shape[0]
+
+
+def follow_cnv(
+        file_path: str | PathLike[str],
+        build_model: Callable[[StimuliProfile], VerFishDModel],
+        columns: Optional[Sequence[str]] = None,
+        poll_interval: float = 1.0,
+        idle_timeout: Optional[float] = 60.0,
+        tolerance: float = 1e-4,
+        equilibrium_tolerance: float = 1e-8,
+        max_steps: int = 10_000,
+        seed: Optional[int] = None
+) -> Iterator[VerFishDModel]:
+    """
+    Estimate the fish distribution while a CNV file is being written during a cast.
+
+    Whenever new scans arrive, only they are parsed, their factor responses are calculated and the
+    previous distribution is integrated toward the new equilibrium with ``simulate_adaptive``.
+    Only the last state is kept in ``steps``, so memory and the cost of an update do not grow
+    with the length of the cast.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the growing CNV file.
+    build_model : Callable[[StimuliProfile], VerFishDModel]
+        Creates the model for the first scans. The model is updated in place afterwards.
+    columns : Sequence of str, optional
+        The stimuli columns to keep in addition to 'depth'.
+    poll_interval : float, optional
+        The seconds to wait before checking the file again when no new scans arrived.
+    idle_timeout : float, optional
+        Stop once no new scans arrived for this many seconds. None follows the file forever.
+    tolerance : float, optional
+        The accepted local error per step of ``simulate_adaptive``.
+    equilibrium_tolerance : float, optional
+        The relative rate of change at which ``simulate_adaptive`` considers the distribution settled.
+    max_steps : int, optional
+        The maximum number of adaptive steps per update.
+    seed : int, optional
+        Seed passed to every ``simulate_adaptive`` call.
+
+    Yields
+    ------
+    VerFishDModel
+        The model after every update. ``result`` holds the current distribution estimate and
+        ``steps`` only the last state.
+    """
+    tail = CNVTail(file_path, columns)
+    model: Optional[VerFishDModel] = None
+    last_update = time.monotonic()
+
+    while True:
+        if tail.poll() > 0:
+            if model is None:
+                model = build_model(cast(StimuliProfile, tail.profile))
+            else:
+                model.update_profile()
+
+            model.simulate_adaptive(
+                tolerance=tolerance,
+                equilibrium_tolerance=equilibrium_tolerance,
+                max_steps=max_steps,
+                seed=seed
+            )
+            # The next update only continues from the last state, so earlier steps are dropped
+            model.steps = model.steps.iloc[:, -1:]
+            last_update = time.monotonic()
+            yield model
+        elif idle_timeout is not None and time.monotonic() - last_update >= idle_timeout:
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+def _reference_names() -> Dict[str, str]:
+    """
+    The channel names used by the seabird package, e.g. 'PSAL' for 'sal00'.
+    """
+    try:
+        text = resources.files('seabird').joinpath('rules/refnames.json').read_text()
+    except (FileNotFoundError, ModuleNotFoundError):
+        return {}
+
+    return {name: reference['name'] for name, reference in json.loads(text).items()}
@@ -0,0 +1,299 @@
+# Vectorized step loop shared by the single- and multi-population models
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def run_migration_steps(initial: np.ndarray, migration_speeds: np.ndarray, number_of_steps: int) -> np.ndarray:
+    """
+    Run the migration step loop for one or more populations at once.
+
+    In every step the share ``|w|`` of the fish at each depth moves one cell up (w > 0) or
+    down (w < 0). Afterwards the total mass of each population is renormalized to its initial
+    value. The computation runs in the dtype of ``initial``, but the totals are always summed in
+    float64, so the population does not drift in single precision.
+
+    Parameters
+    ----------
+    initial : np.ndarray
+        The fish distribution to start from with shape (depths,) or (populations, depths).
+    migration_speeds : np.ndarray
+        The migration speed for each depth, with the same shape as ``initial``.
+    number_of_steps : int
+        The number of steps to simulate.
+
+    Returns
+    -------
+    np.ndarray
+        The fish distribution after every step with shape (number_of_steps, *initial.shape).
+    """
+    steps = np.empty((number_of_steps, *initial.shape), dtype=initial.dtype)
+    current = initial
+    mass = initial.sum(axis=-1, keepdims=True, dtype=np.float64)
+
+    up_mask = (migration_speeds > 0)
+    down_mask = (migration_speeds < 0)
+    speed = np.abs(migration_speeds).astype(initial.dtype)
+
+    for step in range(number_of_steps):
+        current = _migration_step(current, speed, up_mask, down_mask, mass)
+        steps[step] = current
+
+    return steps
+
+
+def migrate(initial: np.ndarray, migration_speeds: np.ndarray, number_of_steps: int) -> np.ndarray:
+    """
+    Run the migration step loop like ``run_migration_steps`` but only keep the final distribution.
+
+    Parameters
+    ----------
+    initial : np.ndarray
+        The fish distribution to start from with shape (depths,) or (populations, depths).
+    migration_speeds : np.ndarray
+        The migration speed for each depth, with the same shape as ``initial``.
+    number_of_steps : int
+        The number of steps to simulate.
+
+    Returns
+    -------
+    np.ndarray
+        The fish distribution after the last step.
+    """
+    current = initial
+    mass = initial.sum(axis=-1, keepdims=True, dtype=np.float64)
+
+    up_mask = (migration_speeds > 0)
+    down_mask = (migration_speeds < 0)
+    speed = np.abs(migration_speeds).astype(initial.dtype)
+
+    for _ in range(number_of_steps):
+        current = _migration_step(current, speed, up_mask, down_mask, mass)
+
+    return current
+
+
+def _migration_step(current: np.ndarray, speed: np.ndarray, up_mask: np.ndarray, down_mask: np.ndarray, mass: np.ndarray) -> np.ndarray:
+    """
+    Compute a single migration step followed by the renormalization of the total mass.
+    """
+    # Compute migration changes first
+    migrated_up = np.zeros_like(current)
+    migrated_down = np.zeros_like(current)
+
+    migrated_values = speed * current
+
+    migrated_up[..., :-1] += migrated_values[..., 1:] * up_mask[..., 1:]
+    migrated_up[..., 1:] -= migrated_values[..., 1:] * up_mask[..., 1:]
+
+    migrated_down[..., 1:] += migrated_values[..., :-1] * down_mask[..., :-1]
+    migrated_down[..., :-1] -= migrated_values[..., :-1] * down_mask[..., :-1]
+
+    # Apply migration
+    next_step = current + migrated_up + migrated_down
+
+    # Normalize total mass to conserve population, summing in float64 to avoid drift in single precision
+    total_current = next_step.sum(axis=-1, keepdims=True, dtype=np.float64)
+    scale = np.divide(mass, total_current, out=np.ones_like(total_current), where=total_current > 0)
+    next_step *= scale.astype(next_step.dtype)
+
+    return next_step
+
+
+@dataclass
+class AdaptiveIntegration:
+    """
+    The outcome of an adaptive integration toward equilibrium.
+
+    Attributes
+    ----------
+    times : np.ndarray
+        The simulated time after every accepted step.
+    states : np.ndarray
+        The fish distribution after every accepted step with shape (steps, depths).
+    time : float
+        The effective simulated time.
+    number_of_steps : int
+        The number of accepted steps.
+    rejected_steps : int
+        The number of steps rejected by the error control.
+    converged : bool
+        Whether the equilibrium tolerance was reached.
+    """
+
+    times: np.ndarray
+    states: np.ndarray
+    time: float
+    number_of_steps: int
+    rejected_steps: int
+    converged: bool
+
+
+def migration_operator(migration_speeds: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the tridiagonal operator A of the migration, so that one unit step is ``x + A @ x``.
+
+    Parameters
+    ----------
+    migration_speeds : np.ndarray
+        The migration speed for each depth.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The sub-diagonal, diagonal and super-diagonal of A. Every column of A sums to zero.
+    """
+    upper = np.maximum(migration_speeds[1:], 0.0)  # A[i, i + 1]: fish moving up from i + 1
+    lower = np.maximum(-migration_speeds[:-1], 0.0)  # A[i + 1, i]: fish moving down from i
+    diagonal = np.zeros(migration_speeds.size)
+    diagonal[1:] -= upper
+    diagonal[:-1] -= lower
+
+    return lower, diagonal, upper
+
+
+def apply_operator(operator: tuple[np.ndarray, np.ndarray, np.ndarray], state: np.ndarray) -> np.ndarray:
+    """
+    Compute ``A @ state`` for a tridiagonal operator created by ``migration_operator``.
+    """
+    lower, diagonal, upper = operator
+    result = diagonal * state
+    result[:-1] += upper * state[1:]
+    result[1:] += lower * state[:-1]
+
+    return result
+
+
+def implicit_step(operator: tuple[np.ndarray, np.ndarray, np.ndarray], state: np.ndarray, dt: float, substeps: int = 1) -> np.ndarray:
+    """
+    Advance the state by ``dt`` with backward Euler, i.e. solve ``(I - h A) y = x`` for each of ``substeps`` steps of size h.
+
+    Backward Euler is unconditionally stable and, since every column of A sums to zero,
+    it conserves the total population for any step size.
+
+    Parameters
+    ----------
+    operator : tuple of np.ndarray
+        The operator created by ``migration_operator``.
+    state : np.ndarray
+        The current fish distribution.
+    dt : float
+        The total time to advance.
+    substeps : int, optional
+        The number of equal backward Euler steps to split ``dt`` into.
+
+    Returns
+    -------
+    np.ndarray
+        The fish distribution after ``dt``.
+    """
+    lower, diagonal, upper = operator
+    h = dt / substeps
+    sub = (-h * lower).tolist()
+    main = (1.0 - h * diagonal).tolist()
+    sup = (-h * upper).tolist()
+    n = len(main)
+
+    # Thomas algorithm: factorize once, then substitute for every substep
+    factors = [0.0] * n
+    pivots = [0.0] * n
+    pivots[0] = main[0]
+    for i in range(1, n):
+        factors[i] = sub[i - 1] / pivots[i - 1]
+        pivots[i] = main[i] - factors[i] * sup[i - 1]
+
+    values = state.tolist()
+    for _ in range(substeps):
+        for i in range(1, n):
+            values[i] -= factors[i] * values[i - 1]
+        values[n - 1] /= pivots[n - 1]
+        for i in range(n - 2, -1, -1):
+            values[i] = (values[i] - sup[i] * values[i + 1]) / pivots[i]
+
+    return np.array(values)
+
+
+def integrate_adaptive(
+        initial: np.ndarray,
+        migration_speeds: np.ndarray,
+        max_time: float = np.inf,
+        tolerance: float = 1e-4,
+        equilibrium_tolerance: float = 1e-8,
+        initial_step: float = 1.0,
+        max_step: float = np.inf,
+        max_steps: int = 10_000
+) -> AdaptiveIntegration:
+    """
+    Integrate the migration toward equilibrium with an error-controlled step size.
+
+    Every step is computed once with step size dt and once with two steps of dt / 2 (step
+    doubling). The difference estimates the local error relative to the total population. Accepted
+    steps keep the more accurate two-step solution and the step size grows as the distribution
+    settles. The total population is renormalized after every step.
+
+    Parameters
+    ----------
+    initial : np.ndarray
+        The fish distribution to start from.
+    migration_speeds : np.ndarray
+        The migration speed for each depth.
+    max_time : float, optional
+        The maximum time to simulate.
+    tolerance : float, optional
+        The accepted local error per step relative to the total population.
+    equilibrium_tolerance : float, optional
+        The integration stops once the relative rate of change ``|A x| / |x|`` drops below this value.
+    initial_step : float, optional
+        The first step size to try. A step size of 1 corresponds to one step of ``simulate``.
+    max_step : float, optional
+        The maximum step size.
+    max_steps : int, optional
+        The maximum number of accepted steps.
+
+    Returns
+    -------
+    AdaptiveIntegration
+        The accepted states together with the simulated time and step counts.
+    """
+    operator = migration_operator(migration_speeds)
+    mass = initial.sum()
+    current = initial.astype(np.float64)
+
+    time = 0.0
+    dt = min(initial_step, max_step, max_time)
+    times, states = [], []
+    rejected = 0
+
+    def is_settled(state: np.ndarray) -> bool:
+        return mass <= 0 or np.abs(apply_operator(operator, state)).sum() / mass < equilibrium_tolerance
+
+    converged = is_settled(current)
+    while not converged and time < max_time and len(states) < max_steps:
+        dt = min(dt, max_time - time)
+        full = implicit_step(operator, current, dt)
+        half = implicit_step(operator, current, dt, substeps=2)
+        error = np.abs(half - full).sum() / mass if mass > 0 else 0.0
+
+        # Backward Euler is first order, so the local error scales with dt ** 2
+        factor = 2.0 if error == 0 else min(2.0, max(0.2, 0.9 * np.sqrt(tolerance / error)))
+
+        if error <= tolerance:
+            # Guard against round-off drift of the total population
+            current = half * (mass / half.sum())
+            time += dt
+            times.append(time)
+            states.append(current)
+            converged = is_settled(current)
+        else:
+            rejected += 1
+
+        dt = min(dt * factor, max_step)
+
+    return AdaptiveIntegration(
+        times=np.array(times),
+        states=np.array(states).reshape(len(states), initial.size),
+        time=time,
+        number_of_steps=len(states),
+        rejected_steps=rejected,
+        converged=converged
+    )
@@ -23,3 +23,27 @@ def migration_speed_with_demographic_noise(E: float, half_saturation_parameter =
     w_behav = (noise + E) * abs(noise + E) / (half_saturation_parameter + abs(noise + E)**2)
 
     return w_max * w_behav
+
+
+def linear_migration_speed(E: float) -> float:
+    """
+    Use the evaluation function value directly as migration speed.
+
+    Parameters
+    ----------
+    E : float
+        The evaluation function value.
+
+    Returns
+    -------
+    float
+        The migration speed.
+    """
+    return E
+
+
+# Migration speeds which can be referenced by name in a model specification
+MIGRATION_SPEEDS = {
+    'linear': linear_migration_speed,
+    'demographic_noise': migration_speed_with_demographic_noise
+}
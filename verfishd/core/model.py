@@ -4,13 +4,52 @@ import pandas as pd
 
 from .physical_factor import PhysicalFactor
 from .physical_stimuli_profile import StimuliProfile
+from .calibration import CalibrationResult, calibrate, observed_on_depths
+from .model_spec import ModelSpec, factor_spec, migration_speed_spec
+from .migration_kernel import AdaptiveIntegration, integrate_adaptive, run_migration_steps
+from .simulation_cache import SimulationCache, fingerprint
 from collections.abc import  Callable
-from itertools import repeat
 from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
+from numpy.typing import DTypeLike
 from os import PathLike
 from rich import print
-from typing import List, cast
+from typing import List, Optional, cast
+
+
+def check_factors(factors: list[PhysicalFactor], stimuli_profile: StimuliProfile):
+    """
+    Validate factors against a stimuli profile.
+
+    Parameters
+    ----------
+    factors : List[PhysicalFactor]
+        A list of PhysicalFactor instances.
+    stimuli_profile : StimuliProfile
+        The stimuli profile containing relevant data.
+
+    Raises
+    ------
+    TypeError
+        If any element in 'factors' is not an instance of PhysicalFactor.
+    ValueError
+        If the factor names are not in the stimuli profile columns.
+    ValueError
+        If the sum of all factor weights is not equal to 1.
+    """
+    if not all(isinstance(factor, PhysicalFactor) for factor in factors):
+        print("[red]All elements in 'factors' must be instances of PhysicalFactor.[/red]")
+        raise TypeError("All elements in 'factors' must be instances of PhysicalFactor.")
+
+    if not all(factor.name in stimuli_profile.columns for factor in factors):
+        column_list = '\n'.join(stimuli_profile.columns.map('- {}'.format))
+        print(f"[red]All factor names must be present in the stimuli profile columns.\nPresent columns:\n[bold]{column_list}[/bold][/red]")
+        raise ValueError(f"All factor names must be present in the stimuli profile columns. Present columns: {stimuli_profile.columns}")
+
+    total_weight = sum(factor.weight for factor in factors)
+    if not abs(total_weight - 1.0) < 1e-6:  # floating point comparison
+        print(f"[red]The sum of all factor weights must be 1.0, but got {total_weight:.6f}.[/red]")
+        raise ValueError(f"The sum of all factor weights must be 1.0, but got {total_weight:.6f}.")
 
 
 class VerFishDModel:
@@ -27,7 +66,8 @@ class VerFishDModel:
             name: str,
             stimuli_profile: StimuliProfile,
             migration_speed: Callable[[float], float],
-            factors: list[PhysicalFactor]
+            factors: list[PhysicalFactor],
+            dtype: DTypeLike = np.float64
     ):
         """
         A class representing a model that manages multiple PhysicalFactors.
@@ -45,16 +85,105 @@ class VerFishDModel:
 
         factors : list of PhysicalFactor, optional
             A list of PhysicalFactor instances (optional).
+        dtype : DTypeLike, optional
+            The floating point type of the factor responses, the simulation state and the step history.
+            ``np.float32`` halves memory and bandwidth; the total population is still accumulated in float64.
         """
+        if not np.issubdtype(np.dtype(dtype), np.floating):
+            print(f"[red]The dtype must be a floating point type, but got {np.dtype(dtype)}.[/red]")
+            raise TypeError(f"The dtype must be a floating point type, but got {np.dtype(dtype)}.")
+
         self.name = name
+        self.dtype = np.dtype(dtype)
         self.migration_speed = migration_speed
         self.__check_factors(factors, stimuli_profile)
         self.__init_steps()
+        self.factor_responses = self.__calculate_factor_responses()
         self.weighted_sum = self.__calculate_weighted_sum()
 
+    @classmethod
+    def from_spec(
+            cls,
+            spec: ModelSpec | str | PathLike[str],
+            stimuli_profile: Optional[StimuliProfile] = None,
+            simulate: bool = False
+    ) -> 'VerFishDModel':
+        """
+        Create a model from a declarative specification.
+
+        Parameters
+        ----------
+        spec: ModelSpec or str
+            The specification or the path to a JSON or TOML file containing it.
+        stimuli_profile: StimuliProfile, optional
+            A profile to use instead of reading the profile source of the specification.
+        simulate: bool, optional
+            Whether to run ``simulate`` with the engine options of the specification.
+
+        Returns
+        -------
+        VerFishDModel
+            The model.
+        """
+        if not isinstance(spec, ModelSpec):
+            spec = ModelSpec.load(spec)
+
+        # The dtype configures the model, all other engine options are passed to `simulate`
+        engine = dict(spec.engine)
+        dtype = engine.pop('dtype', 'float64')
+
+        model = cls(
+            spec.name,
+            stimuli_profile if stimuli_profile is not None else spec.build_profile(),
+            spec.build_migration_speed(),
+            spec.build_factors(),
+            dtype=dtype
+        )
+
+        if simulate:
+            model.simulate(**engine)
+
+        return model
+
+    def to_spec(self, number_of_steps: int = 1000, seed: Optional[int] = None) -> ModelSpec:
+        """
+        Describe the model as a declarative specification.
+
+        Parameters
+        ----------
+        number_of_steps: int, optional
+            The number of steps stored in the engine options.
+        seed: int, optional
+            The seed stored in the engine options.
+
+        Raises
+        ------
+        ValueError
+            If the profile was not read from a file, a factor class cannot be imported or the
+            migration speed is not registered in ``MIGRATION_SPEEDS``.
+
+        Returns
+        -------
+        ModelSpec
+            The specification.
+        """
+        if self.stimuli_profile.source is None:
+            raise ValueError("Only profiles read from a file can be serialized.")
+
+        return ModelSpec(
+            name=self.name,
+            profile=dict(self.stimuli_profile.source),
+            factors=[factor_spec(factor) for factor in self.factors],
+            migration_speed=migration_speed_spec(self.migration_speed),
+            engine={'number_of_steps': number_of_steps, 'seed': seed, 'dtype': self.dtype.name}
+        )
+
     def __init_steps(self):
-        self.steps = pd.DataFrame(index=self.stimuli_profile.data.index)
-        self.steps['t=0'] = 1.0
+        self.steps = pd.DataFrame(index=self.__depth_index())
+        self.steps['t=0'] = np.ones(self.stimuli_profile.depth.size, dtype=self.dtype)
+
+    def __depth_index(self) -> pd.Index:
+        return pd.Index(self.stimuli_profile.depth, name='depth')
 
     def __check_factors(self, factors: list[PhysicalFactor], stimuli_profile: StimuliProfile):
         """
@@ -66,29 +195,8 @@ class VerFishDModel:
             A list of PhysicalFactor instances.
         stimuli_profile : StimuliProfile
             The stimuli profile containing relevant data.
-
-        Raises
-        ------
-        TypeError
-            If any element in 'factors' is not an instance of PhysicalFactor.
-        ValueError
-            If the factor names are not in the stimuli profile columns.
-        ValueError
-            If the sum of all factor weights is not equal to 1.
         """
-        if not all(isinstance(factor, PhysicalFactor) for factor in factors):
-            print("[red]All elements in 'factors' must be instances of PhysicalFactor.[/red]")
-            raise TypeError("All elements in 'factors' must be instances of PhysicalFactor.")
-
-        if not all(factor.name in stimuli_profile.columns for factor in factors):
-            column_list = '\n'.join(stimuli_profile.columns.map('- {}'.format))
-            print(f"[red]All factor names must be present in the stimuli profile columns.\nPresent columns:\n[bold]{column_list}[/bold][/red]")
-            raise ValueError(f"All factor names must be present in the stimuli profile columns. Present columns: {stimuli_profile.columns}")
-
-        total_weight = sum(factor.weight for factor in factors)
-        if not abs(total_weight - 1.0) < 1e-6:  # floating point comparison
-            print(f"[red]The sum of all factor weights must be 1.0, but got {total_weight:.6f}.[/red]")
-            raise ValueError(f"The sum of all factor weights must be 1.0, but got {total_weight:.6f}.")
+        check_factors(factors, stimuli_profile)
 
         self.factors = factors
         self.stimuli_profile = stimuli_profile
@@ -115,16 +223,72 @@ class VerFishDModel:
         pd.DataFrame
             The influence of each factor on the weighted sum.
         """
-        factor_influence = pd.DataFrame(index=self.stimuli_profile.data.index)
+        factor_influence = pd.DataFrame(index=self.__depth_index())
 
-        for factor in self.factors:
-            calc = np.vectorize(factor.calculate)
+        for factor, response in zip(self.factors, self.factor_responses):
             # Use `display_name` here to simplify the plot legend
-            factor_influence[factor.display_name] = calc(self.stimuli_profile.data[factor.name]) * factor.weight
+            factor_influence[factor.display_name] = response * factor.weight
 
         return factor_influence
 
-    def simulate(self, number_of_steps: int = 1000):
+    def __calculate_factor_responses(self) -> np.ndarray:
+        """
+        Calculate the unweighted response of each factor, which does not change with the weights.
+
+        Returns
+        -------
+        np.ndarray
+            The factor responses with shape (factors, depth).
+        """
+        return np.array([
+            factor.calculate_many(self.stimuli_profile.column(factor.name)) for factor in self.factors
+        ], dtype=self.dtype).reshape(len(self.factors), self.stimuli_profile.depth.size)
+
+    def update_profile(self) -> int:
+        """
+        Take up depths which were appended to the stimuli profile after the model was created.
+
+        Only the factor responses of the new depths are calculated. The new depths enter the last
+        recorded step with the initial fish density of 1.0, so ``simulate`` and ``simulate_adaptive``
+        continue from the previous distribution instead of starting over. Earlier steps are NaN for
+        the new depths.
+
+        Raises
+        ------
+        ValueError
+            If the profile has fewer depths than the model.
+
+        Returns
+        -------
+        int
+            The number of new depths.
+        """
+        known = self.factor_responses.shape[1]
+        added = self.stimuli_profile.depth.size - known
+        if added < 0:
+            print("[red]Depths can only be appended to the stimuli profile of a model.[/red]")
+            raise ValueError("Depths can only be appended to the stimuli profile of a model.")
+        if added == 0:
+            return 0
+
+        responses = np.array([
+            factor.calculate_many(self.stimuli_profile.column(factor.name)[known:]) for factor in self.factors
+        ], dtype=self.dtype).reshape(len(self.factors), added)
+        self.factor_responses = np.concatenate([self.factor_responses, responses], axis=1)
+        self.weighted_sum = self.__calculate_weighted_sum()
+
+        steps = np.full((known + added, self.steps.shape[1]), np.nan, dtype=self.dtype)
+        steps[:known] = self.steps.to_numpy(dtype=self.dtype)
+        steps[known:, -1] = 1.0
+        self.steps = pd.DataFrame(steps, index=self.__depth_index(), columns=self.steps.columns)
+
+        if hasattr(self, 'result'):
+            self.result = self.steps.iloc[:, -1]
+            self.result.name = "Fish Probability"
+
+        return added
+
+    def simulate(self, number_of_steps: int = 1000, seed: Optional[int] = None, cache: Optional[SimulationCache] = None):
         """
         Simulate the model for a given number of steps, continuing from the last recorded step.
 
@@ -132,55 +296,204 @@ class VerFishDModel:
         ----------
         number_of_steps: int, optional
             The number of steps to simulate the model for.
+        seed: int, optional
+            Seed for NumPy's global random number generator, used by stochastic migration speeds.
+        cache: SimulationCache, optional
+            A cache for simulation results. Identical inputs return the cached steps instead of
+            simulating again. Stochastic migration speeds are only cached if a seed is supplied.
+
+        Raises
+        ------
+        ValueError
+            If a cache is used with a non-deterministic migration speed and no seed.
         """
         if not hasattr(self, 'steps') or self.steps.empty:
             raise ValueError("Simulation cannot continue without initial state.")
 
-        # Determine starting point
-        last_step_index = self.steps.shape[1] - 1
-        steps_list = [self.steps.iloc[:, -1].copy()]
+        # Continue from the simulated time of the last step, which may come from `simulate_adaptive`
+        start_time = float(self.steps.columns[-1].removeprefix("t="))
+        initial = self.steps.iloc[:, -1].to_numpy(dtype=self.dtype)
+
+        if seed is not None:
+            np.random.seed(seed)
 
         # Precompute migration speeds for all depths
-        migration_speeds = np.vectorize(self.migration_speed)(self.weighted_sum.values)
+        migration_speeds = self.__migration_speeds()
 
-        for _ in repeat(None, number_of_steps):
-            current = steps_list[-1]
-            next_step = pd.Series(0.0, index=current.index)
+        new_steps = None
+        if cache is not None:
+            key = self.__cache_key(migration_speeds, initial, start_time, number_of_steps, seed)
+            new_steps = cache.get(key)
 
-            # Compute migration changes first
-            migrated_up = np.zeros_like(current.values)
-            migrated_down = np.zeros_like(current.values)
+        if new_steps is None:
+            new_steps = run_migration_steps(initial, migration_speeds, number_of_steps)
 
-            up_mask = (migration_speeds > 0)
-            down_mask = (migration_speeds < 0)
+            if cache is not None:
+                cache.put(key, new_steps)
 
-            migrated_values = np.abs(migration_speeds) * current.values
+        # Append results to existing DataFrame
+        new_steps = pd.DataFrame(
+            new_steps.T,
+            index=self.steps.index,
+            columns=[f"t={start_time + t:.10g}" for t in range(1, number_of_steps + 1)]
+        )
 
-            migrated_up[:-1] += migrated_values[1:] * up_mask[1:]
-            migrated_up[1:] -= migrated_values[1:] * up_mask[1:]
+        self.steps = pd.concat([self.steps, new_steps], axis=1)
 
-            migrated_down[1:] += migrated_values[:-1] * down_mask[:-1]
-            migrated_down[:-1] -= migrated_values[:-1] * down_mask[:-1]
+        self.result = self.steps.iloc[:, -1]
+        self.result.name = "Fish Probability"
 
-            # Apply migration
-            next_step += current + migrated_up + migrated_down
+    def simulate_adaptive(
+            self,
+            max_time: float = np.inf,
+            tolerance: float = 1e-4,
+            equilibrium_tolerance: float = 1e-8,
+            initial_step: float = 1.0,
+            max_step: float = np.inf,
+            max_steps: int = 10_000,
+            seed: Optional[int] = None
+    ) -> AdaptiveIntegration:
+        """
+        Simulate the model toward equilibrium with an adaptive, error-controlled time step.
 
-            # Normalize total mass to conserve population
-            total_current = next_step.sum()
-            if total_current > 0:
-                next_step *= current.sum() / total_current
+        Small steps resolve the initial transient while the step size grows as the distribution
+        settles, which needs far fewer iterations than ``simulate`` to reach equilibrium. Every
+        accepted step is appended to ``steps``, labelled with its simulated time.
 
-            steps_list.append(next_step)
+        Parameters
+        ----------
+        max_time: float, optional
+            The maximum time to simulate, measured in steps of ``simulate``.
+        tolerance: float, optional
+            The accepted local error per step relative to the total population.
+        equilibrium_tolerance: float, optional
+            The simulation stops once the relative rate of change of the distribution drops below this value.
+        initial_step: float, optional
+            The first step size to try.
+        max_step: float, optional
+            The maximum step size.
+        max_steps: int, optional
+            The maximum number of accepted steps.
+        seed: int, optional
+            Seed for NumPy's global random number generator, used by stochastic migration speeds.
 
-        # Append results to existing DataFrame
-        new_steps = pd.concat(steps_list[1:], axis=1)
-        new_steps.columns = [f"t={t}" for t in range(last_step_index + 1, last_step_index + number_of_steps + 1)]
+        Returns
+        -------
+        AdaptiveIntegration
+            The effective simulated time, the number of accepted and rejected steps and whether equilibrium was reached.
+        """
+        if not hasattr(self, 'steps') or self.steps.empty:
+            raise ValueError("Simulation cannot continue without initial state.")
 
+        if seed is not None:
+            np.random.seed(seed)
+
+        start_time = float(self.steps.columns[-1].removeprefix("t="))
+        # The error control runs in float64, whatever the dtype of the model
+        migration_speeds = self.__migration_speeds().astype(np.float64)
+        integration = integrate_adaptive(
+            self.steps.iloc[:, -1].to_numpy(dtype=np.float64),
+            migration_speeds,
+            max_time=max_time,
+            tolerance=tolerance,
+            equilibrium_tolerance=equilibrium_tolerance,
+            initial_step=initial_step,
+            max_step=max_step,
+            max_steps=max_steps
+        )
+
+        new_steps = pd.DataFrame(
+            integration.states.T.astype(self.dtype),
+            index=self.steps.index,
+            columns=[f"t={start_time + t:.10g}" for t in integration.times]
+        )
         self.steps = pd.concat([self.steps, new_steps], axis=1)
 
         self.result = self.steps.iloc[:, -1]
         self.result.name = "Fish Probability"
 
+        return integration
+
+    def calibrate(
+            self,
+            observed: pd.Series | np.ndarray,
+            loss: str | Callable[[np.ndarray, np.ndarray], tuple[float, np.ndarray]] = "mse",
+            number_of_steps: int = 1000,
+            max_iterations: int = 200,
+            tolerance: float = 1e-10,
+            seed: Optional[int] = None
+    ) -> CalibrationResult:
+        """
+        Fit the factor weights so that the simulated distribution matches an observed one.
+
+        The unweighted factor responses are reused and the loss gradient is computed with the adjoint
+        of the step loop. The fitted weights are assigned to the factors and the weighted sum is updated.
+        Call ``simulate`` afterwards to record the calibrated simulation.
+
+        Parameters
+        ----------
+        observed: pd.Series or np.ndarray
+            The observed fish distribution, either indexed by depth or with one value per profile depth.
+        loss: str or Callable, optional
+            'mse' or 'kl', or a function returning the loss and its gradient for the predicted and observed distribution.
+        number_of_steps: int, optional
+            The number of steps of the simulation which is compared to the observation.
+        max_iterations: int, optional
+            The maximum number of optimizer iterations.
+        tolerance: float, optional
+            The optimization stops once the loss improves by less than this value.
+        seed: int, optional
+            Seed for NumPy's global random number generator, used by stochastic migration speeds.
+
+        Returns
+        -------
+        CalibrationResult
+            The fitted weights, the final loss and the calibrated distribution.
+        """
+        calibration = calibrate(
+            self.factor_responses,
+            np.array([factor.weight for factor in self.factors], dtype=np.float64),
+            self.migration_speed,
+            self.steps['t=0'].to_numpy(dtype=np.float64),
+            observed_on_depths(observed, self.stimuli_profile.depth),
+            loss=loss,
+            number_of_steps=number_of_steps,
+            max_iterations=max_iterations,
+            tolerance=tolerance,
+            seed=seed
+        )
+
+        for factor, weight in zip(self.factors, calibration.weights):
+            factor.weight = float(weight)
+        self.weighted_sum = self.__calculate_weighted_sum()
+
+        calibration.prediction = pd.Series(calibration.prediction, index=self.steps.index, name="Fish Probability")
+        return calibration
+
+    def __migration_speeds(self) -> np.ndarray:
+        """
+        Evaluate the migration speed for the weighted sum at every depth.
+        """
+        return np.vectorize(self.migration_speed, otypes=[np.float64])(self.weighted_sum.values).astype(self.dtype)
+
+    def __cache_key(self, migration_speeds: np.ndarray, initial: np.ndarray, start_time: float, number_of_steps: int, seed: Optional[int]) -> str:
+        """
+        Create the cache key for a simulation run from the inputs of the step loop.
+
+        The evaluated migration speeds capture everything the factors and the migration speed
+        function depend on, including global state and the draws of a seeded stochastic speed.
+
+        Raises
+        ------
+        ValueError
+            If the migration speed is non-deterministic and no seed is given.
+        """
+        if seed is None and not np.array_equal(migration_speeds, self.__migration_speeds(), equal_nan=True):
+            print("[red]The migration speed is non-deterministic. Supply a seed to cache the simulation.[/red]")
+            raise ValueError("The migration speed is non-deterministic. Supply a seed to cache the simulation.")
+
+        return fingerprint(migration_speeds, initial, start_time, number_of_steps, self.dtype.str)
+
     def plot(self) -> List[Axes]:
         """
         Plot the simulation results including the stimuli profile and evaluation function.
@@ -233,12 +546,13 @@ class VerFishDModel:
 
         lines = []
         for factor in self.factors:
-            data = self.stimuli_profile.data[factor.name]
+            data = self.stimuli_profile.column(factor.name)
+            depth = self.stimuli_profile.depth
 
             # Todo: Refactor this into the PhysicalFactor class instead of hardcoding it here
             if factor.name == "light":
                 ax2 = ax.twiny()
-                line = ax2.plot(data, self.stimuli_profile.data.index, 'y--', label=factor.display_name, alpha=1)
+                line = ax2.plot(data, depth, 'y--', label=factor.display_name, alpha=1)
                 ax2.set_xlabel("Light")
 
                 # Thresholds for the Light Factor -> Needs to go into the PhysicalFactor class
@@ -251,12 +565,12 @@ class VerFishDModel:
                 for i, threshold in enumerate(thresholds):
                     mask = data < threshold
                     if mask.any():
-                        y_value = cast(float, self.stimuli_profile.data.index[mask.argmax()])
+                        y_value = cast(float, depth[mask.argmax()])
                         threshold_line = ax2.axhline(y=y_value, color=colors[i], linestyle=':', alpha=0.7, label=fr"$\theta_l={threshold}$")
                         line.append(threshold_line)
 
             else:
-                line = ax.plot(data, self.stimuli_profile.data.index, linestyle="dashed", label=factor.display_name, alpha=1)
+                line = ax.plot(data, depth, linestyle="dashed", label=factor.display_name, alpha=1)
 
             lines.extend(line)
 
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import functools
+import importlib
+import inspect
+import json
+import math
+
+from .migration_speed import MIGRATION_SPEEDS
+from .physical_factor import PhysicalFactor
+from .physical_stimuli_profile import StimuliProfile
+from collections.abc import Callable
+from dataclasses import dataclass, field, asdict
+from os import PathLike
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ModelSpec:
+    """
+    A declarative, serializable description of a VerFishDModel.
+
+    A specification only contains plain data, so it can be pickled to worker processes and stored as
+    JSON or TOML to reproduce a run. Factors are referenced by their import path, migration speeds by
+    their name in ``MIGRATION_SPEEDS``.
+
+    Parameters
+    ----------
+    name : str
+        The name of the model.
+    profile : dict
+        The profile source with the keys 'path', 'format' and optionally 'columns', see ``StimuliProfile.read``.
+    factors : list of dict
+        One entry per factor with the keys 'class' ("module:QualifiedName"), 'params' and 'weight'.
+    migration_speed : dict
+        The migration speed with the keys 'name' and optionally 'params'.
+    engine : dict
+        Options passed to ``VerFishDModel.simulate``, e.g. 'number_of_steps' and 'seed'.
+    """
+
+    name: str
+    profile: Dict[str, Any]
+    factors: List[Dict[str, Any]]
+    migration_speed: Dict[str, Any]
+    engine: Dict[str, Any] = field(default_factory=lambda: {'number_of_steps': 1000})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the specification to a dictionary of plain data.
+        """
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> ModelSpec:
+        """
+        Create a specification from a dictionary as returned by ``to_dict``.
+        """
+        return cls(
+            name=data['name'],
+            profile=dict(data['profile']),
+            factors=[dict(factor) for factor in data['factors']],
+            migration_speed=dict(data['migration_speed']),
+            engine=dict(data.get('engine', {'number_of_steps': 1000}))
+        )
+
+    def save(self, file_path: str | PathLike[str]) -> None:
+        """
+        Save the specification as JSON or TOML, depending on the file extension.
+
+        Parameters
+        ----------
+        file_path: str
+            The path to a '.json' or '.toml' file.
+        """
+        file_path = Path(file_path)
+        if file_path.suffix == '.toml':
+            file_path.write_text(_to_toml(self.to_dict()))
+        else:
+            file_path.write_text(json.dumps(self.to_dict(), indent=2))
+
+    @classmethod
+    def load(cls, file_path: str | PathLike[str]) -> ModelSpec:
+        """
+        Load a specification from a JSON or TOML file.
+
+        A relative profile path is resolved against the directory of the specification file.
+
+        Parameters
+        ----------
+        file_path: str
+            The path to a '.json' or '.toml' file.
+
+        Raise
+        -----
+        ImportError
+            If a TOML file is loaded on Python 3.10 without ``tomli``.
+
+        Returns
+        -------
+        ModelSpec
+            The loaded specification.
+        """
+        file_path = Path(file_path)
+        if file_path.suffix == '.toml':
+            try:
+                import tomllib
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError as error:
+                    raise ImportError("Reading TOML files on Python 3.10 requires tomli. Install it with 'pip install tomli'.") from error
+            spec = cls.from_dict(tomllib.loads(file_path.read_text()))
+        else:
+            spec = cls.from_dict(json.loads(file_path.read_text()))
+
+        if 'path' in spec.profile and not Path(spec.profile['path']).is_absolute():
+            spec.profile['path'] = str(file_path.parent / spec.profile['path'])
+
+        return spec
+
+    def build_profile(self) -> StimuliProfile:
+        """
+        Read the stimuli profile described by the specification.
+        """
+        return StimuliProfile.read(self.profile)
+
+    def build_factors(self) -> list[PhysicalFactor]:
+        """
+        Create the factors described by the specification.
+
+        Raise
+        -----
+        TypeError
+            If a referenced class is not a PhysicalFactor.
+        """
+        factors = []
+        for factor in self.factors:
+            module_name, _, qualified_name = factor['class'].partition(':')
+            factor_class: Any = importlib.import_module(module_name)
+            for attribute in qualified_name.split('.'):
+                factor_class = getattr(factor_class, attribute)
+
+            if not (isinstance(factor_class, type) and issubclass(factor_class, PhysicalFactor)):
+                raise TypeError(f"'{factor['class']}' is not a PhysicalFactor.")
+
+            factors.append(factor_class(**factor.get('params', {}), weight=factor['weight']))
+
+        return factors
+
+    def build_migration_speed(self) -> Callable[[float], float]:
+        """
+        Create the migration speed described by the specification.
+
+        Raise
+        -----
+        ValueError
+            If the migration speed name is unknown.
+        """
+        name = self.migration_speed['name']
+        if name not in MIGRATION_SPEEDS:
+            raise ValueError(f"Unknown migration speed '{name}'. Available migration speeds: {list(MIGRATION_SPEEDS)}")
+
+        params = self.migration_speed.get('params', {})
+        return functools.partial(MIGRATION_SPEEDS[name], **params) if params else MIGRATION_SPEEDS[name]
+
+
+def factor_spec(factor: PhysicalFactor) -> Dict[str, Any]:
+    """
+    Describe a factor by its import path, constructor parameters and weight.
+
+    The constructor parameters are read from the attributes of the same name.
+
+    Raise
+    -----
+    ValueError
+        If the class cannot be imported or a constructor parameter is not available as plain data.
+    """
+    factor_class = type(factor)
+    if '<locals>' in factor_class.__qualname__ or factor_class.__module__ == '__main__':
+        raise ValueError(f"The factor class '{factor_class.__qualname__}' must be importable to be serialized.")
+
+    params = {}
+    for name, parameter in inspect.signature(factor_class.__init__).parameters.items():
+        if name in ('self', 'weight') or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        if not hasattr(factor, name):
+            raise ValueError(f"The factor '{factor.name}' has no attribute for its constructor parameter '{name}'.")
+
+        value = getattr(factor, name)
+        if not isinstance(value, (str, int, float, bool, list)):
+            raise ValueError(f"The constructor parameter '{name}' of factor '{factor.name}' is not plain data.")
+        params[name] = value
+
+    return {'class': f"{factor_class.__module__}:{factor_class.__qualname__}", 'params': params, 'weight': factor.weight}
+
+
+def migration_speed_spec(migration_speed: Callable[[float], float]) -> Dict[str, Any]:
+    """
+    Describe a migration speed by its name in ``MIGRATION_SPEEDS`` and its parameters.
+
+    Raise
+    -----
+    ValueError
+        If the migration speed is not registered, e.g. a lambda.
+    """
+    params: Dict[str, Any] = {}
+    function = migration_speed
+    if isinstance(migration_speed, functools.partial) and not migration_speed.args:
+        function, params = migration_speed.func, dict(migration_speed.keywords)
+
+    for name, registered in MIGRATION_SPEEDS.items():
+        if function is registered:
+            return {'name': name, 'params': params}
+
+    raise ValueError(f"Only registered migration speeds can be serialized: {list(MIGRATION_SPEEDS)}")
+
+
+def _to_toml(data: Dict[str, Any]) -> str:
+    """
+    Write a specification dictionary as TOML. None values are omitted.
+    """
+    lines: list[str] = []
+    _write_table(lines, data, [])
+    return '\n'.join(lines).strip() + '\n'
+
+
+def _write_table(lines: list[str], table: Dict[str, Any], path: list[str]) -> None:
+    tables = {key: value for key, value in table.items() if isinstance(value, dict)}
+    arrays = {key: value for key, value in table.items() if isinstance(value, list) and value and all(isinstance(item, dict) for item in value)}
+
+    for key, value in table.items():
+        if value is not None and key not in tables and key not in arrays:
+            lines.append(f"{_toml_key(key)} = {_toml_value(value)}")
+
+    for key, value in tables.items():
+        lines.extend(['', f"[{'.'.join(_toml_key(part) for part in path + [key])}]"])
+        _write_table(lines, value, path + [key])
+
+    for key, items in arrays.items():
+        for item in items:
+            lines.extend(['', f"[[{'.'.join(_toml_key(part) for part in path + [key])}]]"])
+            _write_table(lines, item, path + [key])
+
+
+def _toml_key(key: str) -> str:
+    return key if key.replace('_', '').replace('-', '').isalnum() else json.dumps(key)
+
+
+def _toml_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and not math.isfinite(value):
+        return 'nan' if math.isnan(value) else ('inf' if value > 0 else '-inf')
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(_toml_value(item) for item in value) + ']'
+
+    # JSON strings and numbers are valid TOML values
+    return json.dumps(value)
@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+
+from .migration_kernel import run_migration_steps
+from .model import check_factors
+from .physical_factor import PhysicalFactor
+from .physical_stimuli_profile import StimuliProfile
+from .simulation_cache import fingerprint
+from collections.abc import Callable, Mapping
+from numpy.typing import DTypeLike
+from os import PathLike
+from rich import print
+from typing import Optional
+
+
+class MultiPopulationModel:
+    """
+    A class representing several fish populations sharing one stimuli profile.
+
+    Every population (e.g. a species or size class) has its own factors and weights. Factor
+    responses are evaluated once per distinct factor and profile column, combined into a
+    (populations x depth) weighted sum and all populations are simulated in one vectorized loop.
+    """
+
+    name: str
+    populations: list[str]
+    weighted_sum: pd.DataFrame
+    steps: dict[str, pd.DataFrame]
+    result: pd.DataFrame
+
+    def __init__(
+            self,
+            name: str,
+            stimuli_profile: StimuliProfile,
+            migration_speed: Callable[[float], float] | Mapping[str, Callable[[float], float]],
+            populations: Mapping[str, list[PhysicalFactor]],
+            dtype: DTypeLike = np.float64
+    ):
+        """
+        A class representing several fish populations sharing one stimuli profile.
+
+        Parameters
+        ----------
+        name : str
+            The name of the model.
+        stimuli_profile : StimuliProfile
+            The stimuli profile shared by all populations.
+        migration_speed : Callable[[float], float] or Mapping[str, Callable[[float], float]]
+            The migration speed function used by all populations, or one function per population.
+        populations : Mapping[str, list of PhysicalFactor]
+            The factors of each population, keyed by population name.
+        dtype : DTypeLike, optional
+            The floating point type of the factor responses, the simulation state and the step history.
+
+        Raises
+        ------
+        TypeError
+            If the dtype is not a floating point type.
+        ValueError
+            If no populations are given or a migration speed is missing for a population.
+        """
+        if not np.issubdtype(np.dtype(dtype), np.floating):
+            print(f"[red]The dtype must be a floating point type, but got {np.dtype(dtype)}.[/red]")
+            raise TypeError(f"The dtype must be a floating point type, but got {np.dtype(dtype)}.")
+
+        if len(populations) == 0:
+            print("[red]At least one population is required.[/red]")
+            raise ValueError("At least one population is required.")
+
+        for factors in populations.values():
+            check_factors(factors, stimuli_profile)
+
+        if isinstance(migration_speed, Mapping) and set(migration_speed) != set(populations):
+            print("[red]A migration speed must be given for every population.[/red]")
+            raise ValueError("A migration speed must be given for every population.")
+
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.stimuli_profile = stimuli_profile
+        self.migration_speed = migration_speed
+        self.populations = list(populations)
+        self.factors = {population: list(factors) for population, factors in populations.items()}
+        self.weighted_sum = self.__calculate_weighted_sum()
+        self.__init_steps()
+
+    def __init_steps(self):
+        self._history = np.ones((1, len(self.populations), self.stimuli_profile.depth.size), dtype=self.dtype)
+        self.__update_steps()
+
+    def __calculate_weighted_sum(self) -> pd.DataFrame:
+        """
+        Calculate the weighted sum of the factors for each population and depth.
+
+        Factors of the same class which only differ in their weight share one evaluation of their response.
+
+        Returns
+        -------
+        pd.DataFrame
+            The weighted sum with one column per population.
+        """
+        responses: dict[tuple[type, str], np.ndarray] = {}
+        weights: dict[tuple[type, str], np.ndarray] = {}
+
+        for index, population in enumerate(self.populations):
+            for factor in self.factors[population]:
+                # Classes are compared by identity, since equally named classes may calculate differently
+                try:
+                    key = (type(factor), fingerprint({k: v for k, v in vars(factor).items() if k != 'weight'}))
+                except TypeError:
+                    # Attributes which are not plain data cannot be compared, so the factor is evaluated on its own
+                    key = (type(factor), f"id={id(factor)}")
+                if key not in responses:
+                    responses[key] = factor.calculate_many(self.stimuli_profile.column(factor.name)).astype(self.dtype)
+                    weights[key] = np.zeros(len(self.populations), dtype=self.dtype)
+                weights[key][index] += factor.weight
+
+        # (populations x factors) @ (factors x depth)
+        weight_matrix = np.column_stack(list(weights.values()))
+        response_matrix = np.vstack(list(responses.values()))
+        weighted_sum = weight_matrix @ response_matrix
+
+        return pd.DataFrame(weighted_sum.T, index=self.__depth_index(), columns=self.populations)
+
+    def __depth_index(self) -> pd.Index:
+        return pd.Index(self.stimuli_profile.depth, name='depth')
+
+    def __migration_speeds(self) -> np.ndarray:
+        """
+        Evaluate the migration speed of every population for every depth.
+
+        Returns
+        -------
+        np.ndarray
+            The migration speeds with shape (populations, depth).
+        """
+        weighted_sum = self.weighted_sum.to_numpy().T
+
+        if isinstance(self.migration_speed, Mapping):
+            return np.vstack([
+                np.vectorize(self.migration_speed[population], otypes=[np.float64])(weighted_sum[index])
+                for index, population in enumerate(self.populations)
+            ])
+
+        return np.vectorize(self.migration_speed, otypes=[np.float64])(weighted_sum)
+
+    def simulate(self, number_of_steps: int = 1000, seed: Optional[int] = None):
+        """
+        Simulate all populations for a given number of steps, continuing from the last recorded step.
+
+        Parameters
+        ----------
+        number_of_steps: int, optional
+            The number of steps to simulate the model for.
+        seed: int, optional
+            Seed for NumPy's global random number generator, used by stochastic migration speeds.
+        """
+        if seed is not None:
+            np.random.seed(seed)
+
+        # Precompute migration speeds for all populations and depths
+        migration_speeds = self.__migration_speeds()
+        new_steps = run_migration_steps(self._history[-1], migration_speeds.astype(self.dtype), number_of_steps)
+
+        self._history = np.concatenate([self._history, new_steps])
+        self.__update_steps()
+
+    def __update_steps(self):
+        """
+        Split the step history into one DataFrame per population and update the result.
+        """
+        columns = [f"t={t}" for t in range(self._history.shape[0])]
+        self.steps = {
+            population: pd.DataFrame(self._history[:, index, :].T, index=self.__depth_index(), columns=columns)
+            for index, population in enumerate(self.populations)
+        }
+
+        self.result = pd.DataFrame(self._history[-1].T, index=self.__depth_index(), columns=self.populations)
+        self.result.columns.name = "Fish Probability"
+
+    def save_result(self, file_path: str | PathLike[str] | None) -> None:
+        """
+        Save the simulation result of all populations to a file.
+
+        Parameters
+        ----------
+        file_path: str
+            The path to the file.
+        """
+        if file_path is None:
+            self.result.to_csv(f"{self.name}_simulation_result.csv")
+        else:
+            self.result.to_csv(file_path)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import numpy as np
+import os
+import pandas as pd
+
+from .migration_kernel import migrate
+from .model import VerFishDModel
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional
+
+# Shared arrays attached once per worker process by `_attach`
+_worker: dict[str, Any] = {}
+
+
+def sweep_weights(
+        model: VerFishDModel,
+        weights: Sequence[Sequence[float]] | np.ndarray,
+        number_of_steps: int = 1000,
+        seeds: Optional[Sequence[Optional[int]]] = None,
+        processes: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Simulate a model for many weight sets (or seeds) on a pool of processes sharing memory.
+
+    The unweighted factor responses, the initial distribution and a preallocated result array are
+    placed in ``multiprocessing.shared_memory``. Workers attach to them without copying and write
+    their final distribution directly into their row of the result, so neither the profile nor
+    pandas objects are pickled per task.
+
+    Parameters
+    ----------
+    model : VerFishDModel
+        The model to sweep. Its migration speed must be picklable, e.g. a module-level function.
+    weights : Sequence of Sequence of float or np.ndarray
+        One weight set per run with one weight per factor of the model. Each set must sum to 1.
+    number_of_steps : int, optional
+        The number of steps to simulate each run for.
+    seeds : Sequence of int, optional
+        One seed per run for stochastic migration speeds, e.g. to run a reproducible ensemble.
+        Without seeds, every worker draws from its own random state.
+    processes : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+
+    Raises
+    ------
+    ValueError
+        If the weights or seeds do not match the model or a weight set does not sum to 1.
+
+    Returns
+    -------
+    pd.DataFrame
+        The final fish distribution of every run, indexed by depth with one column per run.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    runs = weights.shape[0]
+
+    if weights.shape[1] != len(model.factors):
+        raise ValueError(f"Every weight set must have one weight per factor ({len(model.factors)}).")
+    if not np.allclose(weights.sum(axis=1), 1.0, atol=1e-6):
+        raise ValueError("Every weight set must sum to 1.0.")
+    if seeds is not None and len(seeds) != runs:
+        raise ValueError("There must be one seed per weight set.")
+
+    responses = model.factor_responses
+    initial = model.steps['t=0'].to_numpy(dtype=np.float64)
+    shapes = {'responses': responses.shape, 'initial': initial.shape, 'result': (runs, initial.size)}
+    # Factor responses are kept in the dtype of the model, e.g. float32 in single precision mode
+    dtypes = {'responses': responses.dtype.str, 'initial': initial.dtype.str, 'result': np.dtype(np.float64).str}
+
+    processes = processes or os.cpu_count() or 1
+
+    # Blocks are created one at a time, so a failed allocation only releases the blocks which exist
+    blocks: dict[str, SharedMemory] = {}
+    try:
+        blocks['responses'] = _share(responses)
+        blocks['initial'] = _share(initial)
+        blocks['result'] = SharedMemory(create=True, size=max(runs * initial.size * 8, 1))
+
+        with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_attach,
+                initargs=({key: block.name for key, block in blocks.items()}, shapes, dtypes, model.migration_speed, number_of_steps)
+        ) as pool:
+            tasks = [(run, weights[run], None if seeds is None else seeds[run]) for run in range(runs)]
+            list(pool.map(_run, tasks, chunksize=max(1, runs // (4 * processes))))
+
+        result = np.ndarray(shapes['result'], dtype=np.float64, buffer=blocks['result'].buf).copy()
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    return pd.DataFrame(result.T, index=model.steps.index, columns=pd.RangeIndex(runs, name='run'))
+
+
+def _share(array: np.ndarray) -> SharedMemory:
+    """
+    Copy an array into a new shared memory block.
+    """
+    block = SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    return block
+
+
+def _attach(
+        names: dict[str, str],
+        shapes: dict[str, tuple[int, ...]],
+        dtypes: dict[str, str],
+        migration_speed: Callable[[float], float],
+        number_of_steps: int
+) -> None:
+    """
+    Attach a worker process to the shared arrays.
+    """
+    for key, name in names.items():
+        # Workers share the parent's resource tracker, so the parent alone unlinks the blocks
+        block = SharedMemory(name=name)
+        _worker[f"{key}_block"] = block
+        _worker[key] = np.ndarray(shapes[key], dtype=dtypes[key], buffer=block.buf)
+
+    # Forked workers inherit the random state of the parent, so runs without seed would repeat each other
+    np.random.seed()
+    _worker['migration_speed'] = np.vectorize(migration_speed, otypes=[np.float64])
+    _worker['number_of_steps'] = number_of_steps
+
+
+def _run(task: tuple[int, np.ndarray, Optional[int]]) -> None:
+    """
+    Simulate one weight set and write the final distribution into its row of the shared result.
+    """
+    run, weights, seed = task
+    if seed is not None:
+        np.random.seed(seed)
+
+    migration_speeds = _worker['migration_speed'](_worker['responses'].T @ weights)
+    _worker['result'][run] = migrate(_worker['initial'], migration_speeds, _worker['number_of_steps'])
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class PhysicalFactor(ABC):
     """
@@ -38,6 +40,28 @@ class PhysicalFactor(ABC):
 
         return self._calculate(value)
 
+    def calculate_many(self, values: np.ndarray) -> np.ndarray:
+        """
+        Calculate the factor for an array of input values.
+
+        Subclasses with a vectorized implementation can override this method.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Numeric inputs to the calculation.
+
+        Returns
+        -------
+        np.ndarray
+            The results of the calculation as float64 array.
+        """
+        values = np.asarray(values)
+        if not np.issubdtype(values.dtype, np.number):
+            raise TypeError("The input values must be numbers (int or float).")
+
+        return np.vectorize(self.calculate, otypes=[np.float64])(values)
+
     @abstractmethod
     def _calculate(self, value: float) -> float:
         """
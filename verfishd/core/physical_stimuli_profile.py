@@ -1,16 +1,29 @@
 from __future__ import annotations
+import os
 from os import PathLike
+from pathlib import Path
 from seabird import fCNV
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence
 
 
 class StimuliProfile:
-    """A class for managing tabular stimuli data with a required 'depth' index."""
+    """
+    A class for managing tabular stimuli data with a required 'depth' index.
+
+    Numeric stimuli are stored column-wise: a contiguous float64 ``depth`` array and a
+    Fortran-ordered 2D ``values`` array of shape (depths, stimuli), so every stimulus column
+    is a contiguous block of memory. Non-numeric columns (e.g. station ids or timestamps)
+    are kept aside and only joined back when the pandas DataFrame is materialized via ``data``.
+
+    ``depth``, ``values`` and ``column`` return read-only views and ``data`` returns a copy, so
+    the profile is only edited by assigning a DataFrame to ``data``, ``add_entry``,
+    ``add_stimuli`` and ``extend``.
+    """
 
-    columns: pd.Index
-    data: pd.DataFrame
     cnv: Optional[fCNV]
+    source: Optional[Dict[str, Any]]
 
     def __init__(self, data: pd.DataFrame, cnv: Optional[fCNV] = None) -> None:
         """
@@ -24,9 +37,109 @@ class StimuliProfile:
         if 'depth' not in data.columns:
             raise ValueError("'depth' must be included as a column.")
 
-        self.columns = data.columns
-        self.data = data.set_index('depth')
+        self.__ingest(data)
         self.cnv = cnv
+        self.source = None
+
+    def __ingest(self, data: pd.DataFrame) -> None:
+        """
+        Split a DataFrame into the columnar numeric store and the non-numeric remainder.
+
+        Parameters
+        ----------
+        data: pd.DataFrame
+            The stimuli profile data including the 'depth' column.
+        """
+        stimuli_columns = [column for column in data.columns if column != 'depth']
+        numeric = [column for column in stimuli_columns if pd.api.types.is_numeric_dtype(data[column])]
+
+        self._depth = np.ascontiguousarray(data['depth'].to_numpy(dtype=np.float64))
+        self._values = np.asfortranarray(data[numeric].to_numpy(dtype=np.float64).reshape(len(data), len(numeric)))
+        self._stimuli = numeric
+        self._column_order = list(data.columns)
+        self._extra = data[[column for column in stimuli_columns if column not in numeric]].reset_index(drop=True)
+
+    @property
+    def depth(self) -> np.ndarray:
+        """
+        A read-only view of the depths of the profile as contiguous float64 array.
+        """
+        return self.__read_only(self._depth)
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        A read-only view of the numeric stimuli as Fortran-ordered float64 array with shape (depths, stimuli).
+        """
+        return self.__read_only(self._values)
+
+    @property
+    def stimuli(self) -> List[str]:
+        """
+        The names of the numeric stimuli in the order of the columns of ``values``.
+        """
+        return list(self._stimuli)
+
+    @property
+    def columns(self) -> pd.Index:
+        """
+        The columns of the profile including 'depth'.
+        """
+        return pd.Index(self._column_order)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        The profile as a pandas DataFrame indexed by 'depth'.
+
+        Every access materializes a new copy of the columnar store. To edit the profile through
+        pandas, assign the edited DataFrame back to ``data``.
+        """
+        frame = pd.DataFrame(self._values, columns=self._stimuli, copy=True)
+        frame = pd.concat([frame, self._extra], axis=1) if not self._extra.empty else frame
+        frame.index = pd.Index(self._depth.copy(), name='depth')
+
+        return frame[[column for column in self._column_order if column != 'depth']]
+
+    @data.setter
+    def data(self, data: pd.DataFrame) -> None:
+        self.__ingest(data.reset_index())
+        self.source = None
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Return a zero-copy view of a numeric stimulus column.
+
+        Parameters
+        ----------
+        name: str
+            The name of the stimulus column.
+
+        Raise
+        -----
+        ValueError
+            If the column does not exist or is not numeric.
+
+        Returns
+        -------
+        np.ndarray
+            A read-only, contiguous float64 view into the profile values.
+        """
+        if name == 'depth':
+            return self.__read_only(self._depth)
+        if name in self._stimuli:
+            return self.__read_only(self._values[:, self._stimuli.index(name)])
+
+        raise ValueError(f"'{name}' is not a numeric stimulus of this profile. Available stimuli: {self._stimuli}")
+
+    @staticmethod
+    def __read_only(array: np.ndarray) -> np.ndarray:
+        """
+        Return a view of an array which cannot be written to, so the store is only edited by the profile.
+        """
+        view = array.view()
+        view.flags.writeable = False
+        return view
 
     def add_entry(self, depth: float, data: Dict[str, Any]) -> None:
         """
@@ -39,10 +152,59 @@ class StimuliProfile:
         data: Dict[str, Any]
             A dictionary of column values (excluding 'depth').
         """
-        if not all(col in self.columns for col in data.keys()):
+        if not all(col in self._column_order for col in data.keys()):
             raise ValueError(f"Invalid columns in data. Expected columns: {self.columns}")
 
-        self.data.loc[depth] = data
+        matches = np.flatnonzero(self._depth == depth)
+        if matches.size == 0:
+            row = np.full((1, len(self._stimuli)), np.nan)
+            self._depth = np.append(self._depth, np.float64(depth))
+            self._values = np.asfortranarray(np.vstack([self._values, row]))
+            self._extra = pd.concat([self._extra, pd.DataFrame(index=[0], columns=self._extra.columns)], ignore_index=True)
+            position = self._depth.size - 1
+        else:
+            self._values = np.array(self._values, order='F')
+            position = matches[0]
+
+        for column, value in data.items():
+            if column in self._stimuli:
+                self._values[position, self._stimuli.index(column)] = value
+            else:
+                self._extra.loc[position, column] = value
+
+        self.source = None
+
+    def extend(self, depth: np.ndarray, values: np.ndarray) -> None:
+        """
+        Append many rows of numeric stimuli at once.
+
+        Non-numeric columns are left empty for the new rows.
+
+        Parameters
+        ----------
+        depth: np.ndarray
+            The depths of the new rows.
+        values: np.ndarray
+            The stimuli of the new rows with shape (rows, stimuli), in the order of ``stimuli``.
+
+        Raise
+        -----
+        ValueError
+            If the shape of the values does not match the depths and stimuli.
+        """
+        depth = np.asarray(depth, dtype=np.float64).reshape(-1)
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (depth.size, len(self._stimuli)):
+            raise ValueError(f"Expected values with shape ({depth.size}, {len(self._stimuli)}), but got {values.shape}.")
+
+        self._depth = np.concatenate([self._depth, depth])
+        self._values = np.asfortranarray(np.vstack([self._values, values]))
+        if not self._extra.columns.empty:
+            self._extra = pd.concat([self._extra, pd.DataFrame(index=pd.RangeIndex(depth.size), columns=self._extra.columns)], ignore_index=True)
+        else:
+            self._extra = pd.DataFrame(index=pd.RangeIndex(self._depth.size))
+
+        self.source = None
 
     def add_stimuli(self, stimuli: pd.Series) -> None:
         """
@@ -53,13 +215,69 @@ class StimuliProfile:
         stimuli: pd.Series
             The stimuli series to add.
         """
-        if not all(stimuli.index == self.data.index):
+        if not np.array_equal(stimuli.index.to_numpy(dtype=np.float64), self._depth):
             raise ValueError("Stimuli series 'depth' values must match the existing data.")
 
-        self.data = self.data.join(stimuli)
+        if pd.api.types.is_numeric_dtype(stimuli):
+            self._values = np.asfortranarray(np.column_stack([self._values, stimuli.to_numpy(dtype=np.float64)]))
+            self._stimuli = self._stimuli + [stimuli.name]
+        else:
+            self._extra = self._extra.assign(**{stimuli.name: stimuli.to_numpy()})
+
+        self._column_order = self._column_order + [stimuli.name]
+        self.source = None
+
+    def save_npy(self, directory: str | PathLike[str]) -> None:
+        """
+        Save the numeric part of the profile as ``.npy`` files which can be memory-mapped later.
+
+        Parameters
+        ----------
+        directory: str
+            The directory to write ``depth.npy``, ``values.npy`` and ``stimuli.npy`` to.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "depth.npy", self._depth)
+        np.save(directory / "values.npy", self._values)
+        np.save(directory / "stimuli.npy", np.array(self._stimuli, dtype=np.str_))
+
+    @classmethod
+    def load_npy(cls, directory: str | PathLike[str], mmap_mode: Optional[str] = 'r') -> StimuliProfile:
+        """
+        Load a profile written by ``save_npy``, memory-mapping the arrays by default.
+
+        Parameters
+        ----------
+        directory: str
+            The directory containing ``depth.npy``, ``values.npy`` and ``stimuli.npy``.
+        mmap_mode: str, optional
+            The memory-map mode passed to ``numpy.load``. Use None to read the arrays into memory.
+
+        Returns
+        -------
+        StimuliProfile
+            The StimuliProfile instance.
+        """
+        directory = Path(directory)
+        profile = cls.__new__(cls)
+        profile._depth = np.load(directory / "depth.npy", mmap_mode=mmap_mode)
+        profile._values = np.load(directory / "values.npy", mmap_mode=mmap_mode)
+        profile._stimuli = [str(name) for name in np.load(directory / "stimuli.npy")]
+        profile._column_order = ['depth'] + profile._stimuli
+        profile._extra = pd.DataFrame(index=pd.RangeIndex(profile._depth.size))
+        profile.cnv = None
+        profile.source = {'path': os.path.abspath(directory), 'format': 'npy'}
+
+        return profile
 
     @classmethod
-    def read_from_tabular_file(cls, file_path: str | PathLike[str], file_type: str = "csv") -> StimuliProfile:
+    def read_from_tabular_file(
+            cls,
+            file_path: str | PathLike[str],
+            file_type: str = "csv",
+            columns: Optional[Sequence[str]] = None
+    ) -> StimuliProfile:
         """
         Read stimuli data from a file and populate the table.
 
@@ -68,7 +286,10 @@ class StimuliProfile:
         file_path: str
             The path to the file.
         file_type: str
-            The file type ('csv', 'excel'). Default is 'csv'.
+            The file type ('csv', 'excel', 'parquet', 'feather'). Default is 'csv'.
+        columns: Sequence[str], optional
+            The stimuli columns to load in addition to 'depth'. By default, all columns are loaded.
+            Parquet and Feather files only read the projected columns from disk.
 
         Raise
         -----
@@ -80,18 +301,114 @@ class StimuliProfile:
         StimuliProfile
             The StimuliProfile instance.
         """
+        usecols = None if columns is None else ['depth', *columns]
+
         if file_type == "csv":
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, usecols=usecols)
         elif file_type == "excel":
-            df = pd.read_excel(file_path)
+            df = pd.read_excel(file_path, usecols=usecols)
+        elif file_type == "parquet":
+            df = pd.read_parquet(file_path, columns=usecols)
+        elif file_type == "feather":
+            df = pd.read_feather(file_path, columns=usecols)
         else:
-            raise ValueError("Unsupported file type. Use 'csv' or 'excel'.")
+            raise ValueError("Unsupported file type. Use 'csv', 'excel', 'parquet' or 'feather'.")
+
+        profile = cls(df)
+        profile.source = cls.__source(file_path, file_type, columns)
+        return profile
+
+    @classmethod
+    def read_from_netcdf(
+            cls,
+            file_path: str | PathLike[str],
+            columns: Optional[Sequence[str]] = None,
+            depth_variable: Optional[str] = None
+    ) -> StimuliProfile:
+        """
+        Read stimuli data from a CF-style NetCDF CTD file and populate the table.
+
+        Requires the optional dependency ``xarray`` together with a NetCDF backend such as ``netCDF4``.
+
+        Parameters
+        ----------
+        file_path: str
+            The path to the NetCDF file.
+        columns: Sequence[str], optional
+            The variables to load. By default, all variables along the depth dimension are loaded.
+        depth_variable: str, optional
+            The name of the depth variable. By default, a variable named 'depth' or one with the
+            CF attributes ``standard_name = "depth"`` or ``axis = "Z"`` is used.
+
+        Raise
+        -----
+        ImportError
+            If xarray is not installed.
+        ValueError
+            If no one-dimensional depth variable is found in the file.
+
+        Returns
+        -------
+        StimuliProfile
+            The StimuliProfile instance.
+        """
+        try:
+            import xarray as xr
+        except ImportError as error:
+            raise ImportError("Reading NetCDF files requires xarray. Install it with 'pip install xarray netCDF4'.") from error
 
-        return cls(df)
+        with xr.open_dataset(file_path) as dataset:
+            # A single cast is often stored with length-one time/station dimensions
+            dataset = dataset.squeeze(drop=True)
+            depth_name = depth_variable or cls.__find_depth_variable(dataset)
+            if depth_name is None or dataset[depth_name].ndim != 1:
+                raise ValueError("No one-dimensional depth variable found in file.")
 
+            dimension = dataset[depth_name].dims[0]
+            if columns is None:
+                columns = [
+                    name for name, variable in dataset.data_vars.items()
+                    if variable.dims == (dimension,) and name != depth_name
+                ]
+
+            df = pd.DataFrame({
+                'depth': dataset[depth_name].values,
+                **{name: dataset[name].values for name in columns}
+            })
+
+        profile = cls(df)
+        profile.source = cls.__source(file_path, 'netcdf', columns)
+        if depth_variable is not None:
+            profile.source['depth_variable'] = depth_variable
+        return profile
+
+    @staticmethod
+    def __find_depth_variable(dataset: Any) -> Optional[str]:
+        """
+        Find the depth variable of a NetCDF dataset following the CF conventions.
+
+        Parameters
+        ----------
+        dataset: xarray.Dataset
+            The opened dataset.
+
+        Returns
+        -------
+        str or None
+            The name of the depth variable or None if there is none.
+        """
+        for name in dataset.variables:
+            if str(name).lower() == 'depth':
+                return str(name)
+
+        for name, variable in dataset.variables.items():
+            if variable.attrs.get('standard_name') == 'depth' or variable.attrs.get('axis') == 'Z':
+                return str(name)
+
+        return None
 
     @classmethod
-    def read_from_cnv(cls, file_path: str | PathLike[str]) -> StimuliProfile:
+    def read_from_cnv(cls, file_path: str | PathLike[str], columns: Optional[Sequence[str]] = None) -> StimuliProfile:
         """
         Read stimuli data from a CNV file and populate the table.
         TODO: Pretty sure the .cnv data needs some love before it can be used here.
@@ -100,6 +417,8 @@ class StimuliProfile:
         ----------
         file_path: str
             The path to the CNV file.
+        columns: Sequence[str], optional
+            The stimuli columns to keep in addition to 'depth'. By default, all sensor channels are kept.
 
         Raise
         -----
@@ -119,6 +438,52 @@ class StimuliProfile:
         if 'depth' not in data.columns:
             data['depth'] = data.index
 
-        df = data
+        df = data if columns is None else data[['depth', *columns]]
+
+        profile = cls(df, cnv)
+        profile.source = cls.__source(file_path, 'cnv', columns)
+        return profile
+
+    @staticmethod
+    def __source(file_path: str | PathLike[str], file_format: str, columns: Optional[Sequence[str]]) -> Dict[str, Any]:
+        """
+        Describe where a profile was read from, so it can be read again from a model specification.
+        The path is made absolute, so the source stays valid wherever the specification is saved.
+        """
+        source: Dict[str, Any] = {'path': os.path.abspath(file_path), 'format': file_format}
+        if columns is not None:
+            source['columns'] = list(columns)
+        return source
+
+    @classmethod
+    def read(cls, source: Dict[str, Any]) -> StimuliProfile:
+        """
+        Read a profile from a source description as stored in ``StimuliProfile.source``.
+
+        Parameters
+        ----------
+        source: Dict[str, Any]
+            A dictionary with the 'path' and 'format' of the file and optionally the 'columns' to load.
+
+        Raise
+        -----
+        ValueError
+            If the format is unsupported.
+
+        Returns
+        -------
+        StimuliProfile
+            The StimuliProfile instance.
+        """
+        file_path = source['path']
+        file_format = source.get('format', 'csv')
+        columns = source.get('columns')
+
+        if file_format == 'cnv':
+            return cls.read_from_cnv(file_path, columns)
+        if file_format == 'netcdf':
+            return cls.read_from_netcdf(file_path, columns, source.get('depth_variable'))
+        if file_format == 'npy':
+            return cls.load_npy(file_path)
 
-        return cls(df, cnv)
+        return cls.read_from_tabular_file(file_path, file_format, columns)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from .model import VerFishDModel
+from .physical_stimuli_profile import StimuliProfile
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from os import PathLike
+from typing import Literal, Optional
+
+Source = str | PathLike[str]
+
+
+def simulate_profiles(
+        sources: Iterable[Source],
+        build_model: Callable[[StimuliProfile], VerFishDModel],
+        number_of_steps: int = 1000,
+        reader: Callable[[Source], StimuliProfile] = StimuliProfile.read_from_cnv,
+        prefetch: int = 2,
+        executor: Literal["thread", "process"] = "thread",
+        order: Literal["input", "completion"] = "input",
+        seed: Optional[int] = None
+) -> Iterator[tuple[Source, VerFishDModel]]:
+    """
+    Simulate many profile files while the next ones are parsed in the background.
+
+    Up to ``prefetch`` files are parsed ahead on a thread or process pool while the current
+    profile is simulated. New files are only read once a parsed profile has been taken from the
+    queue, so memory stays bounded however many files are processed.
+
+    Parameters
+    ----------
+    sources : Iterable of str
+        The profile files. The iterable is consumed lazily.
+    build_model : Callable[[StimuliProfile], VerFishDModel]
+        Creates the model for a parsed profile.
+    number_of_steps : int, optional
+        The number of steps to simulate each model for.
+    reader : Callable[[str], StimuliProfile], optional
+        Parses a file into a profile. Defaults to ``StimuliProfile.read_from_cnv``.
+        With the process executor, the reader must be picklable.
+    prefetch : int, optional
+        The maximum number of files parsed ahead.
+    executor : str, optional
+        'thread' or 'process'. Processes avoid contention on the GIL for parsers written in Python.
+    order : str, optional
+        'input' yields results in the order of ``sources``, 'completion' as soon as a profile is parsed.
+    seed : int, optional
+        Seed passed to every ``simulate`` call.
+
+    Raises
+    ------
+    ValueError
+        If prefetch is smaller than 1 or the executor or order is unknown.
+
+    Yields
+    ------
+    tuple of str and VerFishDModel
+        The source and its simulated model.
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1.")
+    if order not in ("input", "completion"):
+        raise ValueError("Unsupported order. Use 'input' or 'completion'.")
+
+    pool = _create_executor(executor, prefetch)
+    pending: deque[tuple[Source, Future[StimuliProfile]]] = deque()
+    remaining = iter(sources)
+
+    def submit_next() -> None:
+        for source in remaining:
+            pending.append((source, pool.submit(reader, source)))
+            return
+
+    try:
+        for _ in range(prefetch):
+            submit_next()
+
+        while pending:
+            if order == "input":
+                source, future = pending.popleft()
+            else:
+                wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+                source, future = next(item for item in pending if item[1].done())
+                pending.remove((source, future))
+
+            profile = future.result()
+
+            # Refill the queue before simulating, so parsing overlaps with the simulation
+            submit_next()
+
+            model = build_model(profile)
+            model.simulate(number_of_steps, seed=seed)
+            yield source, model
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _create_executor(executor: str, max_workers: int) -> Executor:
+    """
+    Create the pool which parses the profiles.
+    """
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="verfishd-reader")
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+
+    raise ValueError("Unsupported executor. Use 'thread' or 'process'.")
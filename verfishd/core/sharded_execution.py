@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import os
+import pandas as pd
+import socket
+import threading
+import time
+import uuid
+
+from .model import VerFishDModel
+from .model_spec import ModelSpec
+from .physical_stimuli_profile import StimuliProfile
+from .work_queue import WorkQueue
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from os import PathLike
+from pathlib import Path
+from typing import List, Optional
+
+SHARD_COLUMNS = ['source', 'depth', 'Fish Probability']
+
+
+def run_worker(
+        queue_path: str | PathLike[str],
+        spec: ModelSpec | str | PathLike[str],
+        output_directory: str | PathLike[str],
+        worker: Optional[str] = None,
+        shard_size: int = 100,
+        heartbeat_interval: float = 10.0,
+        heartbeat_timeout: float = 60.0,
+        max_attempts: int = 3
+) -> int:
+    """
+    Simulate profiles claimed from a shared work queue until the queue is drained.
+
+    Start one worker per core on as many hosts as needed; they only share the queue file and the
+    output directory. Every claimed profile is simulated with the model of ``spec``, its profile
+    source replaced by the task. Results are buffered and written as one CSV shard per
+    ``shard_size`` profiles before their tasks are marked as done, so a crash never loses a result
+    which the queue considers done. A background thread renews the claims every
+    ``heartbeat_interval`` seconds. Once no task is pending, the worker keeps polling while other
+    workers hold claims, so it takes over the tasks of workers which stopped sending heartbeats.
+
+    Parameters
+    ----------
+    queue_path : str
+        The path to the SQLite file of the WorkQueue.
+    spec : ModelSpec or str
+        The model specification or the path to a JSON or TOML file containing it.
+    output_directory : str
+        The directory the shards are written to.
+    worker : str, optional
+        A name which is unique across all workers. Defaults to the host name and process id.
+    shard_size : int, optional
+        The number of profiles per shard.
+    heartbeat_interval : float, optional
+        The seconds between two heartbeats. Must be well below ``heartbeat_timeout``.
+    heartbeat_timeout : float, optional
+        The seconds after which claims without heartbeat are handed out again.
+    max_attempts : int, optional
+        How often a task is claimed before it is marked as failed.
+
+    Raises
+    ------
+    ValueError
+        If the shard size is smaller than 1 or the heartbeat interval is not below the timeout.
+
+    Returns
+    -------
+    int
+        The number of profiles simulated by this worker.
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1.")
+    if not heartbeat_interval < heartbeat_timeout:
+        raise ValueError("The heartbeat interval must be shorter than the heartbeat timeout.")
+
+    if not isinstance(spec, ModelSpec):
+        spec = ModelSpec.load(spec)
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_send_heartbeats,
+        args=(queue_path, worker, heartbeat_interval, heartbeat_timeout, stop),
+        name=f"verfishd-heartbeat-{worker}",
+        daemon=True
+    )
+
+    results: List[pd.DataFrame] = []
+    finished: List[int] = []
+    processed = 0
+
+    with WorkQueue(queue_path, heartbeat_timeout, max_attempts) as queue:
+        def flush() -> None:
+            if finished:
+                _write_shard(pd.concat(results, ignore_index=True), output_directory / f"{worker}-{uuid.uuid4().hex}.csv")
+                queue.complete(finished, worker)
+                results.clear()
+                finished.clear()
+
+        heartbeat.start()
+        try:
+            while True:
+                task = queue.claim(worker)
+                if task is None:
+                    # Finish our own claims, then wait in case another worker stops sending heartbeats
+                    flush()
+                    if queue.counts()['claimed'] == 0:
+                        break
+                    time.sleep(heartbeat_interval)
+                    continue
+
+                try:
+                    profile = StimuliProfile.read({**spec.profile, 'path': task.source})
+                    model = VerFishDModel.from_spec(spec, profile, simulate=True)
+                except Exception as error:
+                    queue.fail(task.id, worker, f"{type(error).__name__}: {error}")
+                    continue
+
+                result = model.result.rename('Fish Probability').rename_axis('depth').reset_index()
+                results.append(result.assign(source=task.source)[SHARD_COLUMNS])
+                finished.append(task.id)
+                processed += 1
+
+                if len(finished) >= shard_size:
+                    flush()
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    return processed
+
+
+def merge_shards(output_directory: str | PathLike[str], file_path: Optional[str | PathLike[str]] = None) -> pd.DataFrame:
+    """
+    Consolidate the shards written by ``run_worker``.
+
+    A profile can appear in several shards if a worker wrote its shard but was considered stale
+    before marking the tasks as done. Only the copy from the first shard is kept.
+
+    Parameters
+    ----------
+    output_directory : str
+        The directory containing the shards.
+    file_path : str, optional
+        A CSV file to write the merged results to. It should be outside of the output directory.
+
+    Returns
+    -------
+    pd.DataFrame
+        The fish distribution of every profile in long format with the columns 'source', 'depth' and 'Fish Probability'.
+    """
+    shards = [pd.read_csv(shard).assign(shard=index) for index, shard in enumerate(sorted(Path(output_directory).glob("*.csv")))]
+    if not shards:
+        merged = pd.DataFrame(columns=SHARD_COLUMNS)
+    else:
+        merged = pd.concat(shards, ignore_index=True)
+        merged = merged[merged['shard'] == merged.groupby('source')['shard'].transform('min')]
+        merged = merged[SHARD_COLUMNS].reset_index(drop=True)
+
+    if file_path is not None:
+        merged.to_csv(file_path, index=False)
+
+    return merged
+
+
+def run_sharded(
+        sources: Iterable[str | PathLike[str]],
+        spec: ModelSpec | str | PathLike[str],
+        output_directory: str | PathLike[str],
+        processes: Optional[int] = None,
+        queue_path: Optional[str | PathLike[str]] = None,
+        shard_size: int = 100,
+        heartbeat_interval: float = 10.0,
+        heartbeat_timeout: float = 60.0,
+        max_attempts: int = 3
+) -> pd.DataFrame:
+    """
+    Queue profile files, simulate them with a pool of local workers and merge the shards.
+
+    This is the single-host form of the sharded execution. To use several hosts, enqueue the files
+    with ``WorkQueue.enqueue``, start ``run_worker`` on every host and call ``merge_shards`` at the end.
+    Files which were already done with the same queue, e.g. before an interruption, are not simulated again.
+
+    Parameters
+    ----------
+    sources : Iterable of str
+        The profile files.
+    spec : ModelSpec or str
+        The model specification or the path to a JSON or TOML file containing it.
+    output_directory : str
+        The directory the shards are written to.
+    processes : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    queue_path : str, optional
+        The path to the SQLite file of the queue. Defaults to 'queue.sqlite' in the output directory.
+    shard_size, heartbeat_interval, heartbeat_timeout, max_attempts
+        See ``run_worker``.
+
+    Returns
+    -------
+    pd.DataFrame
+        The merged results, see ``merge_shards``.
+    """
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+    queue_path = queue_path or output_directory / "queue.sqlite"
+    if not isinstance(spec, ModelSpec):
+        spec = ModelSpec.load(spec)
+
+    with WorkQueue(queue_path, heartbeat_timeout, max_attempts) as queue:
+        queue.enqueue(sources)
+
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        workers = [
+            pool.submit(run_worker, queue_path, spec, output_directory, None, shard_size, heartbeat_interval, heartbeat_timeout, max_attempts)
+            for _ in range(processes)
+        ]
+        for future in workers:
+            future.result()
+
+    return merge_shards(output_directory)
+
+
+def _write_shard(results: pd.DataFrame, file_path: Path) -> None:
+    """
+    Write a shard atomically, so a crash never leaves a partial shard behind.
+    """
+    temporary = file_path.with_name(f"{file_path.name}.tmp")
+    results.to_csv(temporary, index=False)
+    os.replace(temporary, file_path)
+
+
+def _send_heartbeats(queue_path: str | PathLike[str], worker: str, interval: float, heartbeat_timeout: float, stop: threading.Event) -> None:
+    """
+    Renew the claims of a worker until it stops. SQLite connections cannot be shared between threads.
+    """
+    with WorkQueue(queue_path, heartbeat_timeout) as queue:
+        while not stop.wait(interval):
+            queue.heartbeat(worker)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from os import PathLike
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class SimulationCache:
+    """
+    A content-addressed cache for simulation results.
+
+    Results are kept in memory with a least-recently-used eviction policy and, optionally,
+    persisted as ``.npy`` files in a directory so they survive between sessions.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of results kept in memory.
+    directory : str, optional
+        A directory for persisting results on disk. If None, results are only kept in memory.
+    """
+
+    def __init__(self, maxsize: int = 32, directory: Optional[str | PathLike[str]] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+
+        self.maxsize = maxsize
+        self.directory = None if directory is None else Path(directory)
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or (self.directory is not None and (self.directory / f"{key}.npy").exists())
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Look up a cached result.
+
+        Parameters
+        ----------
+        key : str
+            The key created by ``fingerprint``.
+
+        Returns
+        -------
+        np.ndarray or None
+            A copy of the cached result or None if the key is unknown.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key].copy()
+
+        if self.directory is not None:
+            file_path = self.directory / f"{key}.npy"
+            if file_path.exists():
+                value = np.load(file_path)
+                self.__remember(key, value)
+                return value.copy()
+
+        return None
+
+    def put(self, key: str, value: np.ndarray) -> None:
+        """
+        Store a result in memory and, if configured, on disk.
+
+        Parameters
+        ----------
+        key : str
+            The key created by ``fingerprint``.
+        value : np.ndarray
+            The result to store.
+        """
+        value = np.array(value)
+        self.__remember(key, value)
+
+        if self.directory is not None:
+            np.save(self.directory / f"{key}.npy", value)
+
+    def clear(self) -> None:
+        """
+        Remove all results from memory and disk.
+        """
+        self._entries.clear()
+
+        if self.directory is not None:
+            for file_path in self.directory.glob("*.npy"):
+                file_path.unlink()
+
+    def __remember(self, key: str, value: np.ndarray) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Create a stable hash of simulation inputs.
+
+    Arrays are hashed by content and containers by their items. Only plain data is supported,
+    so callers hash what a computation consumes, e.g. evaluated arrays, rather than the code producing it.
+
+    Parameters
+    ----------
+    parts : Any
+        The inputs to hash: None, numbers, strings, bytes, NumPy arrays, pandas objects, lists, tuples and dicts.
+
+    Raises
+    ------
+    TypeError
+        If a part is not plain data.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    _update(digest, parts)
+    return digest.hexdigest()
+
+
+def _update(digest: Any, obj: Any) -> None:
+    """
+    Feed the content of an object into a hash digest.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        digest.update(repr((type(obj).__name__, obj)).encode())
+    elif isinstance(obj, np.generic):
+        _update(digest, obj.item())
+    elif isinstance(obj, np.ndarray):
+        digest.update(f"ndarray{obj.dtype.str}{obj.shape}".encode())
+        digest.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (pd.Series, pd.DataFrame, pd.Index)):
+        _update(digest, (type(obj).__name__, obj.to_numpy(), getattr(obj, 'index', None)))
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update(digest, item)
+    elif isinstance(obj, dict):
+        digest.update(f"dict{len(obj)}".encode())
+        for key in sorted(obj, key=repr):
+            _update(digest, (key, obj[key]))
+    else:
+        raise TypeError(f"Cannot fingerprint objects of type {type(obj).__qualname__}.")
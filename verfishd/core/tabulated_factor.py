@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import functools
+import numpy as np
+
+from .physical_factor import PhysicalFactor
+from .physical_stimuli_profile import StimuliProfile
+from typing import Any, Callable, Dict, Optional
+
+
+class TabulatedFactor(PhysicalFactor):
+    """
+    A PhysicalFactor which evaluates an expensive factor by interpolating a precomputed table.
+
+    The wrapped factor is evaluated once on an evenly spaced grid over its stimulus range.
+    Values inside the range are then linearly interpolated, values outside of it are passed
+    to the wrapped factor.
+
+    Parameters
+    ----------
+    factor : PhysicalFactor
+        The factor to tabulate. Name and weight are taken from this factor.
+    lower : float
+        The lower bound of the tabulated stimulus range.
+    upper : float
+        The upper bound of the tabulated stimulus range.
+    resolution : int
+        The number of grid points of the table.
+    """
+
+    def __init__(self, factor: PhysicalFactor, lower: float, upper: float, resolution: int = 1001):
+        if not lower < upper:
+            raise ValueError("The lower bound must be smaller than the upper bound.")
+        if resolution < 2:
+            raise ValueError("The resolution must be at least 2.")
+
+        super().__init__(factor.name, factor.weight)
+        self.display_name = factor.display_name
+        self.factor = factor
+        self.grid = np.linspace(lower, upper, resolution)
+        self.table = factor.calculate_many(self.grid)
+        self._max_interpolation_error: Optional[float] = None
+
+    @classmethod
+    def from_profile(cls, factor: PhysicalFactor, *profiles: StimuliProfile, resolution: int = 1001) -> TabulatedFactor:
+        """
+        Tabulate a factor over the stimulus range found in one or more profiles.
+
+        Parameters
+        ----------
+        factor : PhysicalFactor
+            The factor to tabulate.
+        profiles : StimuliProfile
+            The profiles containing the factor's stimulus column.
+        resolution : int
+            The number of grid points of the table.
+
+        Returns
+        -------
+        TabulatedFactor
+            The tabulated factor.
+        """
+        values = np.concatenate([profile.column(factor.name) for profile in profiles])
+        return cls(factor, float(np.nanmin(values)), float(np.nanmax(values)), resolution)
+
+    @property
+    def max_interpolation_error(self) -> float:
+        """
+        The estimated maximum absolute difference between the table and the wrapped factor.
+
+        The wrapped factor is evaluated in the middle of every grid interval, where the linear
+        interpolation error of a smooth function is largest. Kinks or jumps between two grid
+        points can cause larger errors close to them.
+        """
+        if self._max_interpolation_error is None:
+            midpoints = (self.grid[:-1] + self.grid[1:]) / 2
+            exact = self.factor.calculate_many(midpoints)
+            self._max_interpolation_error = float(np.max(np.abs(np.interp(midpoints, self.grid, self.table) - exact)))
+
+        return self._max_interpolation_error
+
+    def calculate_many(self, values: np.ndarray) -> np.ndarray:
+        """
+        Calculate the factor for an array of input values by vectorized interpolation.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Numeric inputs to the calculation.
+
+        Returns
+        -------
+        np.ndarray
+            The results of the calculation as float64 array.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        result = np.interp(values, self.grid, self.table)
+
+        outside = (values < self.grid[0]) | (values > self.grid[-1])
+        if outside.any():
+            result[outside] = self.factor.calculate_many(values[outside])
+
+        return result
+
+    def _calculate(self, value: float) -> float:
+        if self.grid[0] <= value <= self.grid[-1]:
+            return float(np.interp(value, self.grid, self.table))
+
+        return self.factor.calculate(value)
+
+
+class MemoizedFactor(PhysicalFactor):
+    """
+    A PhysicalFactor which caches the exact results of an expensive factor.
+
+    Stimulus values which repeat within or across profiles are only calculated once. The
+    number of cached values is bounded by a least-recently-used policy. The cache is built on
+    first use and not pickled, so a copy sent to a worker process starts with an empty cache.
+
+    Parameters
+    ----------
+    factor : PhysicalFactor
+        The factor to cache. Name and weight are taken from this factor.
+    maxsize : int
+        The maximum number of cached values.
+    """
+
+    def __init__(self, factor: PhysicalFactor, maxsize: int = 65536):
+        super().__init__(factor.name, factor.weight)
+        self.display_name = factor.display_name
+        self.factor = factor
+        self.maxsize = maxsize
+        self._cached_calculate: Optional[Callable[[float], float]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_cached_calculate'] = None
+        return state
+
+    def __cached_calculate(self) -> Callable[[float], float]:
+        """
+        Return the cached calculation of the wrapped factor, creating it on first use.
+        """
+        if self._cached_calculate is None:
+            self._cached_calculate = functools.lru_cache(maxsize=self.maxsize)(self.factor.calculate)
+        return self._cached_calculate
+
+    @property
+    def max_interpolation_error(self) -> float:
+        """
+        The maximum difference to the wrapped factor, which is always zero for exact caching.
+        """
+        return 0.0
+
+    def cache_info(self) -> functools._CacheInfo:
+        """
+        Return hit and miss statistics of the cache.
+        """
+        return self.__cached_calculate().cache_info()  # type: ignore[attr-defined]
+
+    def calculate_many(self, values: np.ndarray) -> np.ndarray:
+        """
+        Calculate the factor for an array of input values, evaluating every distinct value once.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Numeric inputs to the calculation.
+
+        Returns
+        -------
+        np.ndarray
+            The results of the calculation as float64 array.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        unique, inverse = np.unique(values, return_inverse=True)
+        cached_calculate = self.__cached_calculate()
+        results = np.fromiter((cached_calculate(float(value)) for value in unique), dtype=np.float64, count=unique.size)
+
+        return results[inverse].reshape(values.shape)
+
+    def _calculate(self, value: float) -> float:
+        return self.__cached_calculate()(float(value))
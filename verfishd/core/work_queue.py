@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from typing import Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    heartbeat REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+"""
+
+
+@dataclass(frozen=True)
+class Task:
+    """
+    A profile claimed from a WorkQueue.
+
+    Attributes
+    ----------
+    id : int
+        The id of the task in the queue.
+    source : str
+        The path to the profile file.
+    attempts : int
+        How often the task has been claimed, including this claim.
+    """
+
+    id: int
+    source: str
+    attempts: int
+
+
+class WorkQueue:
+    """
+    A durable queue of profile files backed by a single SQLite file.
+
+    Any number of processes, also on different hosts sharing a filesystem, can open the same queue.
+    Claims are made in exclusive transactions, so every task is handed to one worker at a time.
+    Workers heartbeat their claimed tasks, and claims whose heartbeat is older than
+    ``heartbeat_timeout`` are handed out again, so tasks of crashed workers are not lost.
+
+    The filesystem must support the file locks SQLite relies on, and the clocks of all hosts should
+    be synchronized to well below ``heartbeat_timeout``.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the SQLite file. It is created if it does not exist.
+    heartbeat_timeout : float
+        The seconds after which a claim without heartbeat is considered stale.
+    max_attempts : int
+        How often a task is claimed before it is marked as failed.
+    timeout : float
+        The seconds to wait for a lock held by another process.
+    """
+
+    def __init__(self, file_path: str | PathLike[str], heartbeat_timeout: float = 60.0, max_attempts: int = 3, timeout: float = 60.0):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+
+        self.file_path = Path(file_path)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self._connection = sqlite3.connect(self.file_path, timeout=timeout, isolation_level=None)
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> WorkQueue:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connection to the queue.
+        """
+        self._connection.close()
+
+    @contextmanager
+    def __transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements in a transaction which holds the write lock from the start.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def enqueue(self, sources: Iterable[str | PathLike[str]]) -> int:
+        """
+        Add profile files to the queue. Files which are already queued are skipped.
+
+        Returns
+        -------
+        int
+            The number of new tasks.
+        """
+        with self.__transaction() as connection:
+            before = connection.total_changes
+            connection.executemany("INSERT OR IGNORE INTO tasks (source) VALUES (?)", ((str(source),) for source in sources))
+            return connection.total_changes - before
+
+    def claim(self, worker: str) -> Optional[Task]:
+        """
+        Claim the next pending task for a worker, after handing stale claims out again.
+
+        Parameters
+        ----------
+        worker : str
+            A name which is unique across all workers.
+
+        Returns
+        -------
+        Task or None
+            The claimed task or None if no task is pending.
+        """
+        with self.__transaction() as connection:
+            self.__requeue_stale(connection)
+            row = connection.execute("SELECT id, source, attempts FROM tasks WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+
+            connection.execute(
+                "UPDATE tasks SET status = 'claimed', worker = ?, heartbeat = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, time.time(), row[0])
+            )
+
+        return Task(id=row[0], source=row[1], attempts=row[2] + 1)
+
+    def heartbeat(self, worker: str) -> int:
+        """
+        Renew the claims of a worker.
+
+        Returns
+        -------
+        int
+            The number of tasks still claimed by the worker.
+        """
+        with self.__transaction() as connection:
+            return connection.execute(
+                "UPDATE tasks SET heartbeat = ? WHERE worker = ? AND status = 'claimed'", (time.time(), worker)
+            ).rowcount
+
+    def complete(self, task_ids: Sequence[int], worker: str) -> int:
+        """
+        Mark tasks as done once their results are written.
+
+        Tasks which were handed to another worker in the meantime are left untouched.
+
+        Returns
+        -------
+        int
+            The number of tasks marked as done.
+        """
+        with self.__transaction() as connection:
+            return sum(connection.execute(
+                "UPDATE tasks SET status = 'done', heartbeat = ?, error = NULL WHERE id = ? AND worker = ? AND status = 'claimed'",
+                (time.time(), task_id, worker)
+            ).rowcount for task_id in task_ids)
+
+    def fail(self, task_id: int, worker: str, error: str) -> None:
+        """
+        Give a task back after an error. It is retried until it was claimed ``max_attempts`` times.
+        """
+        with self.__transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL, error = ? "
+                "WHERE id = ? AND worker = ? AND status = 'claimed'",
+                (self.max_attempts, error, task_id, worker)
+            )
+
+    def requeue_stale(self) -> int:
+        """
+        Hand out claims without a recent heartbeat again.
+
+        Returns
+        -------
+        int
+            The number of stale claims.
+        """
+        with self.__transaction() as connection:
+            return self.__requeue_stale(connection)
+
+    def __requeue_stale(self, connection: sqlite3.Connection) -> int:
+        return connection.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL, "
+            "error = 'The worker stopped sending heartbeats.' WHERE status = 'claimed' AND heartbeat < ?",
+            (self.max_attempts, time.time() - self.heartbeat_timeout)
+        ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count the tasks by status: 'pending', 'claimed', 'done' and 'failed'.
+        """
+        counts = {'pending': 0, 'claimed': 0, 'done': 0, 'failed': 0}
+        counts.update(self._connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+        return counts
+
+    def failed(self) -> Dict[str, str]:
+        """
+        The sources of all failed tasks with their last error.
+        """
+        return dict(self._connection.execute("SELECT source, error FROM tasks WHERE status = 'failed' ORDER BY id").fetchall())